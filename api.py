@@ -0,0 +1,295 @@
+"""
+API HTTP local de extração, para outros serviços consultarem os relatórios sem o Streamlit.
+
+Uso:
+    python -m api --porta 8000 -j 8
+    (ou: uvicorn --factory api:criar_app, configurando pelas variáveis EXTRATOR_API_*)
+
+Endpoints:
+    POST /extrair        Um PDF (multipart, campo "arquivo"); responde com a linha em JSON.
+    POST /extrair/lote   PDFs e/ou ZIPs (multipart, campo "arquivos"); responde em NDJSON,
+                         uma linha por PDF assim que ela fica pronta (ordem de término).
+    GET  /saude          Processos, OCR e reinícios do pool.
+
+PDFs que não puderam ser extraídos voltam como as linhas de quarentena do extrator,
+com as chaves "Falha" (categoria) e "Erro".
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from entrada import iterar_pdfs_abertos
+from extrator import FALHA_PROCESSO, FALHA_TEMPO, aquecer, extrair_pdf, falha, verificar_tamanho
+from processamento import Pista, consultar_cache, guardar_resultado, precisa_ocr
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+# --- Pool de Processos Aquecido ---
+
+PROCESSOS_PADRAO = int(os.environ.get("EXTRATOR_API_PROCESSOS", 0)) or os.cpu_count() or 1
+TEMPO_LIMITE_PADRAO = float(os.environ.get("EXTRATOR_API_TEMPO_LIMITE", 60))
+USAR_CACHE_PADRAO = os.environ.get("EXTRATOR_API_CACHE", "1") != "0"
+USAR_OCR_PADRAO = os.environ.get("EXTRATOR_API_OCR", "1") != "0"
+
+# Segundos que uma conexão HTTP/1.1 ociosa fica aberta esperando a próxima requisição
+KEEP_ALIVE = 75
+
+
+class PoolExtracao:
+    """
+    Pista de processos do motor paralelo (ver processamento.Pista) mantida aberta entre as requisições.
+
+    Os processos sobem (e importam o extrator) na inicialização da API, então cada
+    requisição paga só a extração. O tempo limite conta a partir do momento em que um
+    processo começa a extrair o PDF, não da espera por um processo livre: o PDF que
+    passa dele recebe a falha "tempo_esgotado", os processos são reiniciados e os
+    outros PDFs que estavam no pool são enviados de novo pelas próprias requisições.
+    Se um processo morre, os PDFs afetados são tentados mais uma vez, um de cada vez.
+    """
+
+    def __init__(self, processos: int, tempo_limite: float | None = None, extrator=extrair_pdf):
+        self.processos = processos
+        self.extrator = extrator
+        self._pista = Pista(processos, tempo_limite)
+        self._isolamento = asyncio.Lock()
+
+    @property
+    def tempo_limite(self) -> float | None:
+        return self._pista.tempo_limite
+
+    @property
+    def reinicios(self) -> int:
+        return self._pista.reinicios
+
+    def iniciar(self):
+        # Uma tarefa por processo faz o pool subir todos eles e importar o PyMuPDF antes do primeiro PDF
+        for futuro in [self._pista.enviar((aquecer,), None) for _ in range(self.processos)]:
+            futuro.result()
+            self._pista.concluir(futuro)
+
+    def encerrar(self):
+        self._pista.encerrar()
+
+    async def extrair(self, conteudo: bytes, filename: str) -> dict:
+        """Extrai um PDF em um processo do pool, sem bloquear o loop de eventos."""
+        grande_demais = verificar_tamanho(len(conteudo), filename)
+        if grande_demais:
+            return grande_demais
+        try:
+            return await self._enviar(conteudo, filename)
+        except BrokenProcessPool:
+            pass
+        # Quando um processo morre, todos os PDFs em andamento no pool recebem o erro: eles
+        # são tentados de novo um de cada vez, e só o que derrubar o pool outra vez vira falha.
+        async with self._isolamento:
+            try:
+                return await self._enviar(conteudo, filename)
+            except BrokenProcessPool:
+                return falha(filename, FALHA_PROCESSO, "O processo de extração foi encerrado ao ler este PDF")
+
+    async def _enviar(self, conteudo: bytes, filename: str) -> dict:
+        """
+        Envia o PDF à pista e espera o resultado, verificando o tempo limite a cada segundo.
+
+        A pista só é usada pelo loop de eventos, então não precisa de lock.
+
+        Raises:
+            BrokenProcessPool: Um processo morreu com o PDF no pool (os processos já foram reiniciados).
+        """
+        pista = self._pista
+        intervalo = 1.0 if pista.tempo_limite is not None else None
+        while True:
+            futuro = pista.enviar((self.extrator, conteudo, filename), filename)
+            espera = asyncio.wrap_future(futuro)
+            while futuro in pista.pendentes and not futuro.done():
+                await asyncio.wait({espera}, timeout=intervalo)
+                if intervalo is not None and futuro in pista.estourados():
+                    pista.concluir(futuro)
+                    pista.reiniciar()
+                    espera.cancel()
+                    return falha(filename, FALHA_TEMPO, f"Extração interrompida após {pista.tempo_limite:g}s")
+            if futuro in pista.pendentes:
+                # Terminou com a pista intacta; se o processo morreu, esta requisição reinicia a pista
+                pista.concluir(futuro)
+                if isinstance(futuro.exception(), BrokenProcessPool):
+                    pista.reiniciar()
+            if futuro.done() and not futuro.cancelled():
+                return await espera
+            # A pista foi reiniciada por causa de outro PDF antes de este terminar: ele é enviado de novo
+            espera.cancel()
+
+
+class Servico:
+    """Pools de extração (e de OCR, se disponível) e o cache compartilhados pelas requisições."""
+
+    def __init__(self, processos: int = PROCESSOS_PADRAO, tempo_limite: float | None = TEMPO_LIMITE_PADRAO,
+                 usar_cache: bool = USAR_CACHE_PADRAO, usar_ocr: bool = USAR_OCR_PADRAO):
+        self.pool = PoolExtracao(processos, tempo_limite)
+        self.pool_ocr = None
+        if usar_ocr:
+            from ocr import FATOR_TEMPO_OCR, extrair_pdf_ocr, ocr_disponivel
+            if ocr_disponivel():
+                # OCR em um pool próprio de um processo: não ocupa os processos da extração normal
+                self.pool_ocr = PoolExtracao(1, tempo_limite and tempo_limite * FATOR_TEMPO_OCR, extrair_pdf_ocr)
+        self.cache = None
+        if usar_cache:
+            from cache import CacheResultados
+            self.cache = CacheResultados()
+
+    def iniciar(self):
+        self.pool.iniciar()
+        if self.pool_ocr is not None:
+            self.pool_ocr.iniciar()
+
+    def encerrar(self):
+        self.pool.encerrar()
+        if self.pool_ocr is not None:
+            self.pool_ocr.encerrar()
+
+    async def extrair(self, conteudo: bytes, filename: str) -> dict:
+        """Consulta o cache, extrai no pool e, se o PDF não tiver texto, no pool de OCR."""
+        if isinstance(conteudo, dict):
+            # Membro de ZIP ilegível: a entrada já traz a linha de falha
+            return conteudo
+        sha256, dados = await asyncio.to_thread(consultar_cache, conteudo, filename, self.cache)
+        if dados is not None:
+            return dados
+        dados = await self.pool.extrair(conteudo, filename)
+        if precisa_ocr(dados) and self.pool_ocr is not None:
+            dados = await self.pool_ocr.extrair(conteudo, filename)
+        await asyncio.to_thread(guardar_resultado, sha256, dados, self.cache)
+        return dados
+
+    async def extrair_lote(self, arquivos, janela: int):
+        """
+        Gera as linhas NDJSON dos PDFs (soltos ou em ZIPs) à medida que terminam.
+
+        Args:
+            arquivos: Tuplas (nome, arquivo binário aberto).
+            janela: Máximo de PDFs desta requisição lidos e em extração ao mesmo tempo.
+        """
+        iterador = iterar_pdfs_abertos(arquivos)
+        pendentes = set()
+        fim = False
+        try:
+            while True:
+                while not fim and len(pendentes) < janela:
+                    # Descompactar o ZIP bloqueia: roda em uma thread
+                    item = await asyncio.to_thread(next, iterador, None)
+                    if item is None:
+                        fim = True
+                    else:
+                        pendentes.add(asyncio.create_task(self.extrair(*item)))
+                if not pendentes:
+                    return
+                prontos, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontos:
+                    yield json.dumps(tarefa.result(), ensure_ascii=False) + "\n"
+        finally:
+            # Cliente desconectou no meio do lote
+            for tarefa in pendentes:
+                tarefa.cancel()
+            iterador.close()
+            for _, arquivo in arquivos:
+                arquivo.close()
+
+
+# --- Aplicação ---
+
+
+def criar_app(servico: Servico | None = None) -> "FastAPI":
+    """
+    Cria a aplicação FastAPI; o pool de processos sobe junto com o servidor.
+
+    O FastAPI só é importado aqui: os processos do pool, que reimportam este módulo
+    como __mp_main__ quando a API roda com python -m api, não carregam o framework.
+
+    Args:
+        servico: Servico já configurado (padrão: configurado pelas variáveis EXTRATOR_API_*).
+    """
+    from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+    from fastapi.responses import StreamingResponse
+
+    servico = servico or Servico()
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app: FastAPI):
+        await asyncio.to_thread(servico.iniciar)
+        try:
+            yield
+        finally:
+            servico.encerrar()
+
+    app = FastAPI(title="Extrator DETRAN-SP", lifespan=ciclo_de_vida)
+
+    @app.post("/extrair")
+    async def extrair(arquivo: UploadFile = File(...)) -> dict:
+        """Extrai um PDF e retorna a linha (com "Falha"/"Erro" se ele foi para a quarentena)."""
+        conteudo = await arquivo.read()
+        return await servico.extrair(conteudo, arquivo.filename or "arquivo.pdf")
+
+    @app.post("/extrair/lote")
+    async def extrair_lote(arquivos: list[UploadFile] = File(...),
+                           janela: int = Query(0, ge=0, description="PDFs em extração ao mesmo tempo (0 = 2 por processo).")):
+        """Extrai PDFs e ZIPs e devolve uma linha NDJSON por PDF, na ordem em que terminam."""
+        # Os uploads são copiados antes da resposta começar: o FastAPI os fecha ao fim do handler
+        copias = []
+        for upload in arquivos:
+            nome = upload.filename or "arquivo.pdf"
+            copia = tempfile.TemporaryFile()
+            await asyncio.to_thread(shutil.copyfileobj, upload.file, copia)
+            copia.seek(0)
+            if nome.lower().endswith(".zip") and not zipfile.is_zipfile(copia):
+                for _, aberta in copias + [(nome, copia)]:
+                    aberta.close()
+                raise HTTPException(status_code=400, detail=f"ZIP inválido: {nome}")
+            copia.seek(0)
+            copias.append((nome, copia))
+        return StreamingResponse(
+            servico.extrair_lote(copias, janela or servico.pool.processos * 2),
+            media_type="application/x-ndjson",
+        )
+
+    @app.get("/saude")
+    async def saude() -> dict:
+        return {
+            "processos": servico.pool.processos,
+            "ocr": servico.pool_ocr is not None,
+            "reinicios": servico.pool.reinicios + (servico.pool_ocr.reinicios if servico.pool_ocr else 0),
+        }
+
+    return app
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m api", description="API HTTP local de extração dos relatórios do DETRAN-SP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: só a máquina local).")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("-j", "--processos", type=int, default=PROCESSOS_PADRAO, help="Processos do pool de extração.")
+    parser.add_argument("--tempo-limite", type=float, default=TEMPO_LIMITE_PADRAO,
+                        help="Segundos máximos por PDF (0 = sem limite).")
+    parser.add_argument("--sem-cache", action="store_true", help="Não consulta nem grava o cache de resultados.")
+    parser.add_argument("--sem-ocr", action="store_true", help="Não usa OCR nos PDFs sem camada de texto.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    import uvicorn
+    servico = Servico(args.processos, args.tempo_limite, not args.sem_cache, not args.sem_ocr)
+    # Um único processo do uvicorn: o paralelismo fica no pool de extração
+    uvicorn.run(criar_app(servico), host=args.host, port=args.porta, timeout_keep_alive=KEEP_ALIVE)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
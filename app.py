@@ -0,0 +1,383 @@
+"""
+Interface do Streamlit. O ponto de entrada é test.py (streamlit run test.py), que só
+importa este módulo na execução da página: os processos do pool de extração, que
+reexecutam o script principal ao iniciar, não carregam o Streamlit nem o pandas.
+
+O pandas (e registros, que depende dele) só é importado quando um lote concluído é exibido.
+"""
+import os
+import time
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+from cache import CacheResultados
+from extrator import DESCRICOES_FALHA, em_quarentena, ordenar_colunas
+from indice import IndiceVeiculos, deduplicar
+from lotes import FALHOU, NA_FILA, PROCESSANDO, FilaLotes
+from ocr import ocr_disponivel
+from saida import ESCRITORES
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from registros import FiltrosTabela
+
+# --- Streamlit UI ---
+
+# Opções de linhas por página da tabela de resultados
+TAMANHOS_PAGINA = (50, 100, 500, 1000)
+
+@st.cache_resource
+def obter_cache() -> CacheResultados:
+    """Cache em disco compartilhado por todas as sessões do app."""
+    return CacheResultados()
+
+
+@st.cache_resource
+def obter_indice() -> IndiceVeiculos:
+    """Índice de veículos em disco compartilhado por todas as sessões do app."""
+    return IndiceVeiculos()
+
+
+@st.cache_resource
+def obter_fila() -> FilaLotes:
+    """Fila de lotes em segundo plano, compartilhada por todas as sessões do app."""
+    return FilaLotes(cache=obter_cache(), indice=obter_indice())
+
+
+def lotes_da_sessao() -> list:
+    """
+    Ids dos lotes enviados nesta sessão, do mais recente para o mais antigo.
+
+    O spool é compartilhado por todas as sessões, mas cada visitante só vê (e pode baixar
+    ou remover) os próprios lotes. Os ids também ficam na URL, para que os lotes possam
+    ser reabertos depois de recarregar a página.
+    """
+    if "lotes" not in st.session_state:
+        st.session_state["lotes"] = list(dict.fromkeys(st.query_params.get_all("lote")))
+    return st.session_state["lotes"]
+
+
+def guardar_lotes_da_sessao(ids: list):
+    """Atualiza os lotes da sessão e a URL."""
+    st.session_state["lotes"] = ids
+    st.query_params["lote"] = ids
+
+
+@st.fragment(run_every=2)
+def acompanhar_lote(lote_id: str):
+    """Consulta o andamento do lote a cada 2s, sem bloquear o restante da página."""
+    estado = obter_fila().estado(lote_id)
+    if estado["status"] not in (NA_FILA, PROCESSANDO):
+        st.rerun()
+    if estado["status"] == NA_FILA:
+        st.info("Lote na fila, aguardando o término dos lotes anteriores...")
+    st.progress(
+        estado["concluidos"] / max(estado["total"], 1),
+        text=f"Extraindo dados: {estado['concluidos']}/{estado['total']} arquivo(s) PDF"
+    )
+    st.caption("O processamento continua em segundo plano: você pode recarregar ou fechar a página e voltar depois.")
+
+
+@st.cache_resource(max_entries=4)
+def carregar_lote(lote_id: str, atualizado: float, remover_repetidos: bool) -> dict:
+    """
+    Monta a tabela tipada de um lote concluído e tudo que a página deriva dela.
+
+    Fica em memória no servidor (sem cópia a cada acesso) enquanto o lote estiver entre os
+    últimos abertos; `atualizado` muda quando o lote é reprocessado, invalidando a entrada.
+
+    Returns:
+        Dicionário com df (colunas já ordenadas), filtros (FiltrosTabela), totais (resumir),
+        quarentena (DataFrame), repetidos, com_ocr e paginas_ignoradas.
+    """
+    import pandas as pd
+
+    from registros import FiltrosTabela, resumir, tabela
+
+    all_data = obter_fila().linhas(lote_id)
+    quarentena = [dados for dados in all_data if em_quarentena(dados)]
+    all_data = [dados for dados in all_data if not em_quarentena(dados)]
+    total_linhas = len(all_data)
+    if remover_repetidos:
+        all_data = deduplicar(all_data)
+
+    # Colunas tipadas (valores em R$ como número, anos como inteiro); ausentes ficam em branco
+    df = tabela(all_data)
+    # Reordenar colunas para melhor visualização (uma vez por lote, não a cada rerun)
+    df = df[ordenar_colunas(df.columns)]
+    return {
+        "df": df,
+        "filtros": FiltrosTabela(df),
+        "totais": resumir(df),
+        "quarentena": pd.DataFrame(quarentena, columns=["Nome do Arquivo", "Falha", "Erro"]),
+        "repetidos": total_linhas - len(all_data),
+        "com_ocr": sum('Tempo OCR (s)' in dados for dados in all_data),
+        "paginas_ignoradas": sum(dados.get('Páginas Ignoradas', 0) for dados in all_data),
+    }
+
+
+@st.cache_resource(max_entries=4)
+def carregar_metricas(lote_id: str, atualizado: float) -> "pd.DataFrame":
+    """Linhas por arquivo das métricas do lote, lidas do JSON lines uma vez por versão do lote."""
+    import pandas as pd
+
+    registros = pd.read_json(obter_fila().caminho_metricas(lote_id), lines=True)
+    return registros[registros['tipo'] == 'arquivo']
+
+
+@st.cache_resource(max_entries=16)
+def ler_arquivo_lote(caminho: str, atualizado: float) -> bytes:
+    """
+    Conteúdo de um arquivo gerado pelo lote (saída, quarentena, métricas), para os downloads.
+
+    Como em carregar_lote, `atualizado` muda quando o lote é reprocessado; os reruns da
+    página reaproveitam os bytes em vez de ler o arquivo do disco de novo.
+    """
+    with open(caminho, 'rb') as f:
+        return f.read()
+
+
+@st.fragment
+def mostrar_tabela(lote_id: str, df: "pd.DataFrame", filtros: "FiltrosTabela"):
+    """
+    Mostra uma página da tabela por vez, com filtros.
+
+    A tabela completa fica no servidor; só as linhas da página atual vão para o
+    navegador, então lotes com dezenas de milhares de linhas não travam a página.
+    Trocar de página ou de filtro reexecuta só este fragmento.
+    """
+    from registros import COLUNAS_MOEDA
+
+    coluna_restricao, coluna_ipva, coluna_tamanho = st.columns([2, 2, 1])
+    so_com_restricao = coluna_restricao.checkbox("Só veículos com restrição", key=f"restricao_{lote_id}")
+    ipva_minimo = coluna_ipva.number_input(
+        "IPVA acima de (R$)", min_value=0.0, value=None, step=100.0, key=f"ipva_{lote_id}",
+        placeholder="Sem filtro"
+    )
+    tamanho_pagina = coluna_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1, key=f"tamanho_{lote_id}")
+
+    posicoes = filtros.posicoes(so_com_restricao, ipva_minimo)
+    paginas = max(1, -(-len(posicoes) // tamanho_pagina))
+    # A chave inclui os filtros: mudar um filtro volta para a primeira página
+    pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1, step=1,
+                             key=f"pagina_{lote_id}_{so_com_restricao}_{ipva_minimo}_{tamanho_pagina}")
+    inicio = (pagina - 1) * tamanho_pagina
+    visiveis = posicoes[inicio:inicio + tamanho_pagina]
+
+    st.dataframe(
+        df.iloc[visiveis],
+        column_config={coluna: st.column_config.NumberColumn(format="R$ %.2f") for coluna in COLUNAS_MOEDA},
+    )
+    filtrado = f" (filtradas de {filtros.total})" if len(posicoes) != filtros.total else ""
+    st.caption(f"Linhas {inicio + 1 if len(visiveis) else 0}–{inicio + len(visiveis)} de {len(posicoes)}{filtrado}.")
+
+
+def mostrar_resultado(estado: dict):
+    """Painel de tempos, tabela e download de um lote concluído."""
+    import pandas as pd
+
+    from metricas import ETAPAS_ARQUIVO
+    from registros import formatar_moeda
+
+    fila = obter_fila()
+    lote_id = estado["id"]
+    atualizado = estado["atualizado"]
+    if estado["total"] == 0:
+        st.warning("Nenhum arquivo PDF encontrado no upload. Certifique-se de que os arquivos PDF ou o ZIP contenham PDFs.")
+        return
+    st.success("✅ Extração concluída!")
+
+    # Painel de tempos por etapa
+    resumo = estado["metricas"]
+    with st.sidebar.expander("⏱️ Tempos do processamento", expanded=False):
+        st.caption(
+            f"{resumo['arquivos']} arquivo(s) em {resumo['duracao']:.1f}s "
+            f"({resumo['arquivos_por_segundo']:.1f} arquivo(s)/s, {resumo['acertos_cache']} do cache)"
+        )
+        st.caption(
+            f"Pico de memória: {resumo['memoria']['pico_rss_mb']:.0f} MB · "
+            f"{resumo['memoria']['coletas']} coleta(s) de lixo, {resumo['memoria']['esperas']} espera(s) por memória"
+        )
+        if resumo.get('ocr', {}).get('arquivos'):
+            st.caption(f"OCR: {resumo['ocr']['arquivos']} arquivo(s) digitalizado(s) em {resumo['ocr']['segundos']:.1f}s")
+        st.dataframe(
+            pd.DataFrame(
+                [(etapa, segundos, segundos / max(resumo['arquivos'], 1) * 1000) for etapa, segundos in resumo['etapas'].items()],
+                columns=["Etapa", "Total (s)", "Média por arquivo (ms)"]
+            ),
+            hide_index=True
+        )
+        if resumo['arquivos']:
+            n_lentos = st.number_input("Arquivos mais lentos", min_value=1, max_value=100, value=5, step=1)
+            registros = carregar_metricas(lote_id, atualizado)
+            st.dataframe(
+                registros.nlargest(n_lentos, 'total')[["arquivo", "total", *ETAPAS_ARQUIVO]],
+                hide_index=True
+            )
+        st.download_button("Métricas (JSON lines)", ler_arquivo_lote(fila.caminho_metricas(lote_id), atualizado),
+                           file_name="metricas.jsonl", mime="application/x-ndjson")
+        st.download_button("Métricas (Prometheus)", ler_arquivo_lote(fila.caminho_metricas(lote_id, ".prom"), atualizado),
+                           file_name="metricas.prom", mime="text/plain")
+
+    lote = carregar_lote(lote_id, atualizado, bool(estado.get("deduplicar")))
+    # PDFs que não puderam ser extraídos (corrompidos, sem texto, outro layout...) ficam fora da tabela
+    falhas = lote["quarentena"]
+    if len(falhas):
+        with st.expander(f"⚠️ {len(falhas)} arquivo(s) em quarentena (não puderam ser extraídos)"):
+            st.dataframe(
+                falhas["Falha"].map(lambda categoria: DESCRICOES_FALHA.get(categoria, categoria))
+                .value_counts().rename_axis("Motivo").reset_index(name="Arquivos"),
+                hide_index=True
+            )
+            st.dataframe(falhas, hide_index=True)
+            st.download_button("Relatório de quarentena (CSV)", ler_arquivo_lote(fila.caminho_quarentena(lote_id), atualizado),
+                               file_name="quarentena.csv", mime="text/csv")
+    if lote["repetidos"]:
+        st.caption(f"{lote['repetidos']} relatório(s) de veículos repetidos foram substituídos pelo mais recente.")
+    if lote["com_ocr"]:
+        st.caption(f"{lote['com_ocr']} relatório(s) digitalizado(s) foram lidos com OCR (coluna \"Tempo OCR (s)\").")
+    if lote["paginas_ignoradas"]:
+        st.caption(f"{lote['paginas_ignoradas']} página(s) após o rodapé dos relatórios não precisaram ser lidas.")
+
+    if estado["usar_cache"]:
+        estatisticas = obter_cache().estatisticas()
+        st.sidebar.caption(
+            f"Cache: {estatisticas['acertos']} reaproveitado(s), {estatisticas['falhas']} extraído(s) desde que o app iniciou · "
+            f"{estatisticas['itens']} resultado(s) em disco ({estatisticas['tamanho'] / 1024 / 1024:.1f} MB)"
+        )
+        estatisticas_indice = obter_indice().estatisticas()
+        st.sidebar.caption(
+            f"Índice: {estatisticas_indice['veiculos']} veículo(s) de {estatisticas_indice['arquivos']} relatório(s) distintos"
+        )
+
+    # 3. Exibição e Download
+    df = lote["df"]
+    totais = lote["totais"]
+    coluna_ipva, coluna_multas, coluna_licenciamento, coluna_restricoes = st.columns(4)
+    coluna_ipva.metric("Total IPVA", formatar_moeda(totais["total_ipva"]))
+    coluna_multas.metric("Total de multas (Pix)", formatar_moeda(totais["total_multas"]))
+    coluna_licenciamento.metric("Total de licenciamento", formatar_moeda(totais["total_licenciamento"]))
+    coluna_restricoes.metric("Veículos com restrição", f"{totais['com_restricao']} de {totais['relatorios']}")
+
+    st.subheader("Tabela de Dados Extraídos")
+    mostrar_tabela(lote_id, df, lote["filtros"])
+
+    # Botão de Download
+    formato = estado["formato"]
+    st.download_button(
+        label=f"⬇️ Baixar Tabela em {formato.upper()}",
+        data=ler_arquivo_lote(fila.caminho_saida(lote_id), atualizado),
+        file_name=f'dados_detran_extraidos{ESCRITORES[formato].extensao}',
+        mime=ESCRITORES[formato].mime
+    )
+
+
+def main():
+    """Monta a página (executada a cada interação, como um script do Streamlit)."""
+    st.set_page_config(
+        page_title="Extrator DETRAN-SP PDF",
+        page_icon="🚗",
+        layout="wide"
+    )
+
+    st.title("🚗 Extrator de Dados de Débitos Veiculares (DETRAN-SP PDF)")
+    st.markdown("Faça o upload de um ou mais arquivos PDF (ou um arquivo ZIP) de consulta de débitos do DETRAN-SP para extrair os dados em uma tabela.")
+
+    # Número de processos usados na extração (1 = processamento sequencial)
+    max_workers = st.sidebar.number_input(
+        "Processos paralelos",
+        min_value=1,
+        max_value=(os.cpu_count() or 1) * 2,
+        value=os.cpu_count() or 1,
+        step=1
+    )
+
+    formato_saida = st.sidebar.selectbox("Formato do arquivo de saída", list(ESCRITORES), format_func=str.upper)
+
+    # Resultados já extraídos (mesmo conteúdo de PDF) são lidos do cache em disco
+    usar_cache = st.sidebar.checkbox("Reaproveitar resultados anteriores (cache)", value=True)
+
+    # Reenvios do mesmo veículo viram uma linha só (a do relatório de emissão mais recente)
+    remover_repetidos = st.sidebar.checkbox("Manter só o relatório mais recente de cada veículo", value=False)
+
+    # Acima deste orçamento o app coleta o lixo e para de descompactar até os processos liberarem
+    limite_memoria = st.sidebar.number_input("Limite de memória (MB)", min_value=256, value=2048, step=256)
+
+    # PDFs digitalizados (sem camada de texto) passam pelo OCR em um processo separado
+    usar_ocr = st.sidebar.checkbox("Usar OCR em PDFs digitalizados", value=ocr_disponivel(), disabled=not ocr_disponivel(),
+                                   help=None if ocr_disponivel() else "Tesseract não encontrado (instale-o ou defina TESSDATA_PREFIX).")
+
+    # PDFs que passam deste tempo são interrompidos e vão para a quarentena (0 = sem limite)
+    tempo_limite = st.sidebar.number_input("Tempo limite por PDF (s)", min_value=0, value=60, step=10)
+
+    fila = obter_fila()
+
+    # Widget de Upload
+    uploaded_files = st.file_uploader(
+        "Selecione os arquivos PDF ou um arquivo ZIP",
+        type=["pdf", "zip"],
+        accept_multiple_files=True
+    )
+
+    # 1. Envio do lote
+    # Os arquivos são copiados para o spool e processados em segundo plano; mexer na página
+    # ou perder a conexão não reinicia a extração.
+    if uploaded_files and st.button("▶️ Processar arquivos"):
+        lote_enviado = fila.enviar(
+            ((uploaded_file.name, uploaded_file) for uploaded_file in uploaded_files),
+            formato=formato_saida,
+            processos=max_workers,
+            usar_cache=usar_cache,
+            limite_memoria_mb=limite_memoria,
+            deduplicar=remover_repetidos,
+            tempo_limite=tempo_limite,
+            ocr=usar_ocr,
+        )
+        guardar_lotes_da_sessao([lote_enviado] + lotes_da_sessao())
+        st.session_state["lote"] = lote_enviado
+
+    # 2. Acompanhamento
+    # Só os lotes desta sessão aparecem; como ficam no spool, podem ser reabertos depois
+    # de recarregar a página (os ids ficam na URL).
+    lotes = {}
+    for lote_id in lotes_da_sessao():
+        try:
+            lotes[lote_id] = fila.estado(lote_id)
+        except (OSError, ValueError):
+            continue  # Lote removido (ou id inválido na URL)
+    if list(lotes) != lotes_da_sessao():
+        guardar_lotes_da_sessao(list(lotes))
+    if lotes:
+        ids = list(lotes)
+        lote_atual = st.session_state.get("lote")
+        lote_id = st.sidebar.selectbox(
+            "Lote",
+            ids,
+            index=ids.index(lote_atual) if lote_atual in ids else 0,
+            format_func=lambda i: f"{time.strftime('%d/%m %H:%M', time.localtime(lotes[i]['criado']))} · "
+                                  f"{lotes[i]['arquivos'][0]['nome'] if lotes[i]['arquivos'] else '-'} ({i[:6]})"
+        )
+        estado = fila.estado(lote_id)
+        if estado["status"] in (NA_FILA, PROCESSANDO):
+            acompanhar_lote(lote_id)
+        elif estado["status"] == FALHOU:
+            st.error(f"O processamento do lote falhou: {estado['erro']}")
+        else:
+            mostrar_resultado(estado)
+            if st.sidebar.button("🗑️ Remover lote"):
+                fila.remover(lote_id)
+                guardar_lotes_da_sessao([i for i in ids if i != lote_id])
+                st.session_state.pop("lote", None)
+                st.rerun()
+
+    st.sidebar.header("Instruções")
+    st.sidebar.markdown(
+        """
+        1. **Faça o upload** dos arquivos PDF de consulta de débitos veiculares do DETRAN-SP e clique em **"Processar arquivos"**.
+        2. O sistema irá **extrair** as informações principais (Veículo, Débitos e Restrições) de cada PDF em segundo plano.
+        3. Acompanhe o progresso; os resultados serão exibidos em uma **tabela** quando o lote terminar. PDFs que não puderem ser lidos aparecem na **quarentena**, com o motivo.
+        4. Escolha o formato (CSV, XLSX ou Parquet) e clique em **"Baixar Tabela"** para salvar os dados extraídos.
+        """
+    )
@@ -0,0 +1,63 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+# --- Arquivos Persistentes do App ---
+
+# Pasta base do cache, do índice e da fila de lotes
+PASTA_BASE = os.path.join(os.path.expanduser("~"), ".cache", "pdf-to-xlsx-gov")
+
+
+def caminho_padrao(variavel: str, nome: str) -> str:
+    """
+    Caminho padrão de um arquivo (ou pasta) do app.
+
+    Args:
+        variavel: Variável de ambiente que, se definida, substitui o caminho padrão.
+        nome: Nome do arquivo dentro de PASTA_BASE.
+    """
+    return os.environ.get(variavel, os.path.join(PASTA_BASE, nome))
+
+
+def conectar(caminho: str, esquema: str, versao: int | None = None, descartar: tuple = ()) -> sqlite3.Connection:
+    """
+    Abre (criando a pasta, se preciso) um banco SQLite compartilhado entre processos.
+
+    O banco fica em modo WAL e em autocommit: as escritas usam transacao(). O timeout
+    faz a conexão esperar o lock de escrita de outro processo em vez de falhar.
+
+    Args:
+        caminho: Arquivo do banco.
+        esquema: Script com os CREATE TABLE/INDEX IF NOT EXISTS.
+        versao: Versão do esquema (PRAGMA user_version). Num banco de outra versão, as
+            tabelas de `descartar` são apagadas antes de o esquema ser criado.
+        descartar: Tabelas recriadas quando a versão muda.
+
+    Returns:
+        A conexão, utilizável por várias threads (com um lock de quem a usa).
+    """
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None, check_same_thread=False)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    if versao is not None and conexao.execute("PRAGMA user_version").fetchone()[0] != versao:
+        with transacao(conexao):
+            for tabela in descartar:
+                conexao.execute(f"DROP TABLE IF EXISTS {tabela}")
+            conexao.execute(f"PRAGMA user_version = {int(versao)}")
+    conexao.executescript(esquema)
+    return conexao
+
+
+@contextmanager
+def transacao(conexao: sqlite3.Connection):
+    """Transação de escrita (BEGIN IMMEDIATE): COMMIT ao fim do bloco, ROLLBACK se ele falhar."""
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        yield conexao
+    except BaseException:
+        conexao.execute("ROLLBACK")
+        raise
+    conexao.execute("COMMIT")
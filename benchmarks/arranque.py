@@ -0,0 +1,133 @@
+"""
+Benchmark do tempo de arranque (cold start) do app, da CLI, da API e dos processos do pool.
+
+Cada alvo roda várias vezes em um interpretador novo, com python -X importtime, e o
+relatório mostra o tempo total até o alvo ficar pronto, o tempo gasto em imports, os
+módulos de primeiro nível mais pesados e quais bibliotecas grandes (pandas, Streamlit,
+FastAPI, PyMuPDF) foram carregadas. Alvos cujas dependências não estão instaladas
+aparecem como indisponíveis. O resultado pode ser gravado em JSON e comparado com o
+de outro commit.
+
+Uso:
+    python -m benchmarks.arranque [--repeticoes 5] [--json atual.json] [--comparar anterior.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Código executado por alvo, já no diretório do projeto
+ALVOS = {
+    "python": "pass",
+    # Processo do pool: importa o extrator e o PyMuPDF (processamento.aquecer)
+    "processo": "import processamento, extrator; extrator.aquecer()",
+    # Processo do pool do app: o spawn reexecuta test.py como __mp_main__ antes da tarefa
+    "processo_app": "import runpy; runpy.run_path('test.py', run_name='__mp_main__'); "
+                    "import processamento, extrator; extrator.aquecer()",
+    "cli": "import cli",
+    "app": "import app",
+    "api": "import api",
+}
+
+# Bibliotecas que não deveriam ser carregadas no arranque de todos os alvos
+PESADAS = ("pandas", "numpy", "streamlit", "fastapi", "pymupdf")
+
+
+def _importtime(saida_erro: str) -> tuple[int, dict]:
+    """Soma os imports de primeiro nível do -X importtime (em µs) e retorna também o cumulativo de cada um."""
+    modulos = {}
+    for linha in saida_erro.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, cumulativo, nome = linha.split("|")
+        if cumulativo.strip().isdigit() and not nome.startswith("  "):
+            # Os submódulos vêm indentados sob o módulo que os importou
+            modulos[nome.strip()] = modulos.get(nome.strip(), 0) + int(cumulativo)
+    return sum(modulos.values()), modulos
+
+
+def _medir_alvo(codigo: str, repeticoes: int, mais_pesados: int) -> dict | None:
+    """Roda o alvo em interpretadores novos; None se ele não consegue importar (dependência ausente)."""
+    totais, imports = [], []
+    modulos = {}
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], capture_output=True, text=True)
+        totais.append(time.perf_counter() - inicio)
+        if processo.returncode != 0:
+            return None
+        total_imports, modulos = _importtime(processo.stderr)
+        imports.append(total_imports)
+    carregados = set()
+    for linha in processo.stderr.splitlines():
+        nome = linha.rsplit("|", 1)[-1].strip()
+        carregados.add(nome.split(".")[0])
+    return {
+        "total_ms": statistics.median(totais) * 1000,
+        "imports_ms": statistics.median(imports) / 1000,
+        "mais_pesados": [
+            (nome, cumulativo / 1000)
+            for nome, cumulativo in sorted(modulos.items(), key=lambda m: m[1], reverse=True)[:mais_pesados]
+        ],
+        "pesadas": [biblioteca for biblioteca in PESADAS if biblioteca in carregados],
+    }
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _imprimir(resultados: dict, anterior: dict | None):
+    anteriores = anterior["resultados"] if anterior else {}
+    print(f"{'alvo':<14}{'total':>10}{'imports':>10}   bibliotecas pesadas" + ("   vs. anterior" if anteriores else ""))
+    for alvo, r in resultados.items():
+        if r is None:
+            print(f"{alvo:<14}{'indisponível (dependência ausente)':>20}")
+            continue
+        linha = f"{alvo:<14}{r['total_ms']:>8.0f}ms{r['imports_ms']:>8.0f}ms   {', '.join(r['pesadas']) or '-'}"
+        if anteriores.get(alvo):
+            linha += f"   {r['total_ms'] / anteriores[alvo]['total_ms']:.2f}x"
+        print(linha)
+        if r["mais_pesados"]:
+            print(" " * 14 + "  " + ", ".join(f"{nome} {ms:.0f}ms" for nome, ms in r["mais_pesados"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de arranque do app, da CLI, da API e dos processos do pool.")
+    parser.add_argument("--alvos", default=",".join(ALVOS), help="Alvos separados por vírgula.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Execuções por alvo (o relatório usa a mediana).")
+    parser.add_argument("--mais-pesados", type=int, default=5, help="Quantos imports de primeiro nível listar por alvo.")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo JSON.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar o tempo total.")
+    args = parser.parse_args()
+
+    resultados = {
+        alvo: _medir_alvo(ALVOS[alvo], args.repeticoes, args.mais_pesados)
+        for alvo in args.alvos.split(",")
+    }
+
+    relatorio = {
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "parametros": {"repeticoes": args.repeticoes},
+        "resultados": resultados,
+    }
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+    _imprimir(resultados, anterior)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark de vazão da extração com relatórios sintéticos.
+
+Mede o tempo de cada etapa (abrir o PDF, get_text, limpeza e regex dos campos, como
+medidos pelo próprio extrair_pdf, e a montagem do DataFrame e a exportação CSV),
+documentos por segundo e o pico de memória
+(RSS) para lotes de 1, 100 e 10.000 arquivos. Cada tamanho roda em um subprocesso
+separado, para que o pico de memória de um não contamine o outro. O resultado pode
+ser gravado em JSON e comparado com o de outro commit.
+
+Uso:
+    python -m benchmarks.extracao [--tamanhos 1,100,10000] [--json atual.json] [--comparar anterior.json]
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ETAPAS = ("abrir", "get_text", "limpeza", "campos", "dataframe", "csv")
+
+
+def _medir_lote(quantidade: int, debitos: int, paginas_extras: int) -> dict:
+    """Roda extrair_pdf em cada PDF, no processo atual, e retorna as medidas."""
+    import pandas as pd
+
+    from benchmarks.sintetico import gerar_lote
+    from extrator import em_quarentena, extrair_pdf, ordenar_colunas
+
+    lote = gerar_lote(quantidade, debitos=debitos, paginas_extras=paginas_extras)
+    tempos = dict.fromkeys(ETAPAS, 0.0)
+    all_data = []
+    relogio = time.perf_counter
+
+    inicio_total = relogio()
+    for conteudo, filename in lote:
+        # A mesma função do app e da CLI, com a identificação do modelo e as verificações
+        etapas = {}
+        data = extrair_pdf(conteudo, filename, tempos=etapas)
+        if em_quarentena(data):
+            raise RuntimeError(f"{filename} foi para a quarentena ({data['Falha']}): {data['Erro']}")
+        for etapa, segundos in etapas.items():
+            tempos[etapa] += segundos
+        all_data.append(data)
+
+    t0 = relogio()
+    df = pd.DataFrame(all_data)
+    df = df.fillna('Não informado')
+    df = df[ordenar_colunas(df.columns)]
+    t1 = relogio()
+    df.to_csv(index=False, sep=';', encoding='utf-8')
+    t2 = relogio()
+    tempos["dataframe"] = t1 - t0
+    tempos["csv"] = t2 - t1
+    total = relogio() - inicio_total
+
+    return {
+        "arquivos": quantidade,
+        "segundos": total,
+        "docs_por_segundo": quantidade / total,
+        "etapas_ms_por_doc": {etapa: tempos[etapa] / quantidade * 1000 for etapa in ETAPAS},
+        # ru_maxrss é em KB no Linux
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _imprimir(resultados: list, anterior: dict | None):
+    anteriores = {r["arquivos"]: r for r in anterior["resultados"]} if anterior else {}
+    cabecalho = f"{'arquivos':>9}{'docs/s':>10}{'pico MB':>9}" + "".join(f"{etapa:>11}" for etapa in ETAPAS)
+    print(cabecalho + ("   vs. anterior" if anteriores else ""))
+    for r in resultados:
+        linha = f"{r['arquivos']:>9}{r['docs_por_segundo']:>10.1f}{r['pico_rss_mb']:>9.0f}"
+        linha += "".join(f"{r['etapas_ms_por_doc'][etapa]:>9.3f}ms" for etapa in ETAPAS)
+        if r["arquivos"] in anteriores:
+            linha += f"   {r['docs_por_segundo'] / anteriores[r['arquivos']]['docs_por_segundo']:.2f}x docs/s"
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão da extração com relatórios sintéticos.")
+    parser.add_argument("--tamanhos", default="1,100,10000", help="Tamanhos de lote separados por vírgula.")
+    parser.add_argument("--debitos", type=int, default=5, help="Média de multas listadas por relatório.")
+    parser.add_argument("--paginas-extras", type=int, default=0, help="Páginas anexas após o aviso final.")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo JSON.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar docs/s.")
+    parser.add_argument("--lote", type=int, help=argparse.SUPPRESS)  # Uso interno: mede um único lote
+    args = parser.parse_args()
+
+    if args.lote is not None:
+        print(json.dumps(_medir_lote(args.lote, args.debitos, args.paginas_extras)))
+        return
+
+    resultados = []
+    for tamanho in (int(t) for t in args.tamanhos.split(",")):
+        saida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.extracao", "--lote", str(tamanho),
+             "--debitos", str(args.debitos), "--paginas-extras", str(args.paginas_extras)],
+            capture_output=True, text=True, check=True,
+        )
+        resultados.append(json.loads(saida.stdout))
+
+    relatorio = {
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "parametros": {"debitos": args.debitos, "paginas_extras": args.paginas_extras},
+        "resultados": resultados,
+    }
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+    _imprimir(resultados, anterior)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
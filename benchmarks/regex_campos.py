@@ -0,0 +1,227 @@
+"""
+Micro-benchmark do bloco de regex de extrair_pdf.
+
+Compara o tempo da extração atual (limpar_texto + tabela CAMPOS pré-compilada) com o
+de uma cópia congelada do bloco antigo de re.sub/re.search. A igualdade dos
+resultados nos textos de exemplo é verificada em tests/test_extrator.py.
+
+Uso:
+    python -m benchmarks.regex_campos [--repeticoes 2000]
+"""
+import argparse
+import re
+import time
+
+from extrator import extrair_campos, limpar_texto
+
+TEXTO_BASE = """Marca / Modelo
+VW/GOL 1.0
+Cor
+PRATA
+Renavam
+01234567890
+content_copy
+Ano fabricação
+2015
+Chassi
+9BWAA05U0EP000001
+Ano modelo
+2016
+Tipo
+AUTOMOVEL
+Combustível
+FLEX
+https://www.detran.sp.gov.br/detransp/pb/servicos/veiculos/consultar_debitos_restricoes?id=consultar_debitos_restricoes
+1/4
+17/10/2026, 10:32
+Débitos
+Total de débitos do IPVA
+R$\xa01.234,56
+Total de débitos que podem ser pagos com Pix
+R$\xa0130,16
+Total de débitos fora do sistema estadual de multa
+R$\xa00,00
+Licenciamento
+Data de vencimento do licenciamento 10/05/2024
+Total de débitos R$\xa0160,22
+Restrições do veículo
+Bloqueio de furto/roubo
+Nada consta
+Restrição tributária
+Nada consta
+Restrição financeira
+Alienação fiduciária
+Restrição
+administrativa
+Nada consta
+Restrição judicial
+Nada consta
+Restrição por veículo
+guinchado
+Nada consta
+Restrição de gravame
+Nada consta
+"""
+
+ITEM_DEBITO = "Multa de trânsito {n}\nAuto de infração A{n:08d}\nValor R$\xa0{n},50\n"
+
+
+def textos_de_exemplo() -> dict:
+    """Variações do texto de um relatório, cobrindo campos ausentes e caminhos alternativos."""
+    listagem = "".join(ITEM_DEBITO.format(n=n) for n in range(300))
+    return {
+        "completo": TEXTO_BASE,
+        "sem_ipva_e_pix": re.sub(r"Total de débitos (do IPVA|que podem ser pagos com Pix)\nR\$\xa0[\d.,]+\n", "", TEXTO_BASE),
+        "fora_sem_valor": TEXTO_BASE.replace("multa\nR$\xa00,00", "multa\nNão há débitos"),
+        "ancoras_coladas": TEXTO_BASE.replace("Cor\nPRATA\nRenavam", "CorRenavam\nPRATA\nRenavam"),
+        "corsa": TEXTO_BASE.replace("VW/GOL 1.0", "GM/CORSA HATCH"),
+        "listagem_longa": TEXTO_BASE.replace("Débitos\n", "Débitos\n" + listagem),
+        "rodape_colado": TEXTO_BASE.replace("1/4\n17/10/2026, 10:32", "31/44/4 17/10/2026, 10:32/4,3/4"),
+        "vazio": "",
+    }
+
+
+def extrair_campos_legado(text: str) -> dict:
+    """Cópia congelada do bloco de limpeza e regex de extrair_pdf antes da tabela CAMPOS."""
+    data = {}
+    # 2. Limpeza de Padrões Irrelevantes
+    pattern_link = r"https://www\.detran\.sp\.gov\.br/detransp/pb/servicos/veiculos/consultar_debitos_restricoes[/W?]id=consultar_debitos_restricoes"
+    pattern_num = r"\d+/4"
+    pattern_data_num = r"\d{2}/\d{2}/\d{4},\s+\d{2}:\d{2}"
+    pattern_renavam_copy_icon = r"content_copy" # Assumindo ser um texto gerado pelo ícone
+    
+    text = re.sub(pattern_link, "", text)
+    text = re.sub(pattern_num, "", text)
+    text = re.sub(pattern_data_num, "", text)
+    text = re.sub(pattern_renavam_copy_icon, "", text)
+    
+    # 3. Extração dos Campos com Regex
+    
+    match_marca = re.search(r"Marca / Modelo\s*(.*?)\s*Cor", text, re.DOTALL | re.IGNORECASE)
+    if match_marca:
+        data['Marca / Modelo'] = match_marca.group(1).strip()
+    
+    match_cor = re.search(r"Cor\s*(\w+)", text, re.IGNORECASE)
+    if match_cor:
+        data['Cor'] = match_cor.group(1)
+    
+    match_renavam = re.search(r"Renavam\s*(\d{11})", text, re.IGNORECASE)
+    if match_renavam:
+        data["Renavam"] = match_renavam.group(1)
+    
+    match_ano_fab = re.search(r"Ano\s*fabricação\s*(\d{4})", text, re.IGNORECASE)
+    if match_ano_fab:
+        data['Ano fabricação'] = match_ano_fab.group(1)
+    
+    match_chassi = re.search(r"Chassi\s*([A-Z0-9]{17})", text, re.IGNORECASE)
+    if match_chassi:
+        data['Chassi'] = match_chassi.group(1)
+    
+    match_ano_mod = re.search(r"Ano\s*modelo\s*(\d{4})", text, re.IGNORECASE)
+    if match_ano_mod:
+        data['Ano modelo'] = match_ano_mod.group(1)
+    
+    match_tipo = re.search(r"Tipo\s*(.*?)\s*Combustível", text, re.DOTALL | re.IGNORECASE)
+    if match_tipo:
+        data['Tipo'] = match_tipo.group(1).strip()
+    
+    match_comb = re.search(r"Combustível\s*(\w+)", text, re.IGNORECASE)
+    if match_comb:
+        data['Combustível'] = match_comb.group(1)
+    
+    # Débitos
+    
+    def clean_currency(match):
+        """Função auxiliar para limpar e formatar valores monetários."""
+        if match:
+            valor = match.group(1)
+            # Remove quebras de linha/espaços não-quebráveis (como \xa0)
+            return valor.strip().replace('\xa0', ' ').replace('\n', ' ')
+        return None
+    
+    match_ipva = re.search(r"Total de débitos do IPVA\s*(R\$\s*[\d\.,\s]+)", text)
+    data['Total IPVA'] = clean_currency(match_ipva)
+    
+    # Usa o padrão para 'Total de débitos que podem ser pagos com Pix'
+    match_multas = re.search(r'Total de débitos que podem ser pagos com Pix\s*(R\$\s*[\d\.,\s]+)', text)
+    data['Total Multas (Pix)'] = clean_currency(match_multas)
+    
+    # Tentativa de extrair 'Total de débitos fora do sistema estadual de multa'
+    match_debitos_fora = re.search(r'Total de débitos fora do sistema estadual de multa\s*(R\$\s*[\d\.,\s]+)', text)
+    if match_debitos_fora:
+        data['Total de débitos fora do sistema estadual de multa'] = clean_currency(match_debitos_fora)
+    else:
+         # Tentativa de extração alternativa se o valor não for R$
+         match_debitos_fora_alt = re.search(r'Total de débitos fora do sistema estadual de multa\s*(.*?)\s*Licenciamento', text, re.DOTALL | re.IGNORECASE)
+         if match_debitos_fora_alt:
+            data['Total de débitos fora do sistema estadual de multa'] = match_debitos_fora_alt.group(1).strip().replace('\n', ' ')
+    
+    # Licenciamento
+    # Corrigido o regex para capturar melhor o valor de licenciamento
+    match_ano = re.search(r"vencimento do licenciamento\s+(\d{2}/\d{2}/(\d{4}))", text, re.DOTALL | re.IGNORECASE)
+    if match_ano:
+        # Captura o grupo 2, que é o ano
+        data['Ano Vencimento Licenciamento'] = match_ano.group(2)
+    
+    # 2. Extração do Valor
+    # Procura por "Total de débitos" seguido imediatamente pelo padrão monetário (R$ com números).
+    match_valor = re.search(r"Total de débitos\s*(R\$\s*[\d\.,]+)", text, re.DOTALL)
+    if match_valor:
+        data['Licenciamento - Total de débitos'] = match_valor.group(1).strip().replace('\n', ' ').replace('\xa0', ' ')
+    
+    # Restrições
+    
+    # Bloqueio de furto/roubo
+    match_bloqueio_furto_roubo = re.search(r"Bloqueio de furto/roubo\s*(.*?)\s*Restrição tributária", text, re.DOTALL)
+    if match_bloqueio_furto_roubo:
+        data['Bloqueio de Furto/Roubo'] = match_bloqueio_furto_roubo.group(1).strip().replace('\n', ' ')
+    
+    # Restrição financeira
+    match_restricao_financeira = re.search(r"Restrição financeira\s*(.*?)\s*Restrição\nadministrativa", text, re.DOTALL)
+    if match_restricao_financeira:
+        data['Restrição Financeira'] = match_restricao_financeira.group(1).strip().replace('\n', ' ').replace("Para liberar o pagamento do licenciamento, é preciso que todos os débitos do veículo tenham sido pagos.  Consultar Débitos e Restrições - Detran-SP  2/3", "").replace("Aviso sobre o pagamento do licenciamento Você só pode quitar um licenciamento por vez, começando pelo mais atrasado. Após fazer o pagamento, será exibido o próximo ano disponível para pagar, seguindo a ordem do mais antigo ao mais recente.  Consultar Débitos e Restrições - Detran-SP  2/3", "")
+    
+    # Restrição administrativa
+    restricao_administrativa = re.search(r"Restrição\nadministrativa\s*(.*?)\s*Restrição judicial", text, re.DOTALL)
+    if restricao_administrativa:
+        data['Restrição Administrativa'] = restricao_administrativa.group(1).strip().replace('\n', ' ')
+    
+    # Restrição judicial
+    # O padrão original é muito amplo: r"Restrição judicial\s*(.*?)\s*(.*?)\s*Restrição por veículo\nguinchado"
+    # O primeiro grupo de captura (.*?) provavelmente pega o valor desejado.
+    restricao_judicial = re.search(r"Restrição judicial\s*(.*?)\s*Restrição por veículo\nguinchado", text, re.DOTALL)
+    if restricao_judicial:
+        data['Restrição Judicial'] = restricao_judicial.group(1).strip().replace('\n', ' ')
+    
+    # Restrição por veículo guinchado - Adicionando por completude
+    match_guinchado = re.search(r"Restrição por veículo\nguinchado\s*(.*?)\s*Restrição de gravame", text, re.DOTALL)
+    if match_guinchado:
+        data['Restrição por Veículo Guinchado'] = match_guinchado.group(1).strip().replace('\n', ' ')
+    return data
+
+
+def _cronometrar(funcao, text: str, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(text)
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def _extrair_atual(text: str) -> dict:
+    return extrair_campos(limpar_texto(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repeticoes", type=int, default=2000, help="Execuções por texto de exemplo.")
+    args = parser.parse_args()
+
+    print(f"{'texto':<18}{'legado (µs)':>14}{'atual (µs)':>14}{'ganho':>8}")
+    for nome, text in textos_de_exemplo().items():
+        legado = _cronometrar(extrair_campos_legado, text, args.repeticoes)
+        atual = _cronometrar(_extrair_atual, text, args.repeticoes)
+        print(f"{nome:<18}{legado * 1e6:>14.1f}{atual * 1e6:>14.1f}{legado / atual:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Gerador de relatórios sintéticos de débitos e restrições do DETRAN-SP.
+
+Os PDFs imitam o layout do relatório real (bloco do veículo, débitos, licenciamento,
+restrições, rodapé com link/contador/data e o aviso final), com número de débitos,
+páginas extras e restrições configuráveis. Servem para benchmarks e testes manuais,
+já que o repositório não tem PDFs reais.
+
+Uso:
+    python -m benchmarks.sintetico pasta_saida -n 100 [--debitos 40] [--paginas-extras 2]
+"""
+import argparse
+import os
+import random
+
+import pymupdf
+
+from extrator import MARCADOR_FIM
+
+RESTRICOES = {
+    "furto_roubo": ("Bloqueio de furto/roubo", "Veículo com bloqueio ativo - BO 1234/2024"),
+    "tributaria": ("Restrição tributária", "Restrição tributária Sefaz-SP"),
+    "financeira": ("Restrição financeira", "Alienação fiduciária - Banco Exemplo S.A."),
+    "administrativa": ("Restrição\nadministrativa", "Bloqueio administrativo - Detran-SP"),
+    "judicial": ("Restrição judicial", "Renajud - Restrição de transferência"),
+    "guinchado": ("Restrição por veículo\nguinchado", "Veículo removido ao pátio"),
+    "gravame": ("Restrição de gravame", "Gravame ativo"),
+}
+
+MODELOS = ("VW/GOL 1.0", "FIAT/UNO MILLE", "GM/ONIX 1.4", "HONDA/CG 160 FAN", "TOYOTA/COROLLA XEI", "FORD/KA SE")
+CORES = ("PRATA", "BRANCA", "PRETA", "VERMELHA", "AZUL", "CINZA")
+TIPOS = ("AUTOMOVEL", "MOTOCICLETA", "CAMIONETA")
+COMBUSTIVEIS = ("FLEX", "GASOLINA", "DIESEL", "ALCOOL")
+
+LINK = "https://www.detran.sp.gov.br/detransp/pb/servicos/veiculos/consultar_debitos_restricoes?id=consultar_debitos_restricoes"
+LINHAS_POR_PAGINA = 60
+
+
+def _moeda(valor: float) -> str:
+    inteiro, centavos = f"{valor:.2f}".split(".")
+    return f"R$\xa0{int(inteiro):,}".replace(",", ".") + f",{centavos}"
+
+
+def _linhas_relatorio(rng: random.Random, debitos: int, restricoes) -> list:
+    multas = [round(rng.uniform(88, 1500), 2) for _ in range(debitos)]
+    ipva = round(rng.uniform(0, 4000), 2)
+    licenciamento = round(rng.uniform(0, 200), 2)
+
+    linhas = [
+        "Consultar Débitos e Restrições - Detran-SP",
+        "Marca / Modelo", rng.choice(MODELOS),
+        "Cor", rng.choice(CORES),
+        "Renavam", f"{rng.randrange(10**11):011d}", "content_copy",
+        "Ano fabricação", str(rng.randint(1995, 2024)),
+        "Chassi", "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ0123456789") for _ in range(17)),
+        "Ano modelo", str(rng.randint(1995, 2025)),
+        "Tipo", rng.choice(TIPOS),
+        "Combustível", rng.choice(COMBUSTIVEIS),
+        "Débitos",
+        "Total de débitos do IPVA", _moeda(ipva),
+        "Total de débitos que podem ser pagos com Pix", _moeda(sum(multas)),
+    ]
+    for n, valor in enumerate(multas, start=1):
+        linhas += [f"Multa {n} - Auto de infração 1A{rng.randrange(10**7):07d}", f"Valor {_moeda(valor)}"]
+    linhas += [
+        "Total de débitos fora do sistema estadual de multa", _moeda(0),
+        "Licenciamento",
+        f"Data de vencimento do licenciamento {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2020, 2026)}",
+        f"Total de débitos {_moeda(licenciamento)}",
+        "Restrições do veículo",
+    ]
+    for chave, (rotulo, ativa) in RESTRICOES.items():
+        linhas += rotulo.split("\n")
+        linhas.append(ativa if chave in restricoes else "Nada consta")
+    linhas += [MARCADOR_FIM]
+    return linhas
+
+
+def gerar_relatorio(semente: int = 0, debitos: int = 5, paginas_extras: int = 0, restricoes=()) -> bytes:
+    """
+    Gera um relatório sintético.
+
+    Args:
+        semente: Semente dos valores aleatórios (o mesmo valor gera o mesmo conteúdo).
+        debitos: Quantidade de multas listadas (listas longas ocupam várias páginas).
+        paginas_extras: Páginas anexas depois do aviso final (que a extração pode ignorar).
+        restricoes: Chaves de RESTRICOES que estarão ativas; as demais aparecem como "Nada consta".
+
+    Returns:
+        O PDF em bytes.
+    """
+    rng = random.Random(semente)
+    linhas = _linhas_relatorio(rng, debitos, set(restricoes))
+    paginas = [linhas[i:i + LINHAS_POR_PAGINA] for i in range(0, len(linhas), LINHAS_POR_PAGINA)]
+    paginas += [[f"Anexo {n}"] + ["Informações complementares do veículo."] * 40 for n in range(1, paginas_extras + 1)]
+    total = len(paginas)
+    emissao = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2026, {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+
+    doc = pymupdf.open()
+    for numero, conteudo in enumerate(paginas, start=1):
+        page = doc.new_page()
+        page.insert_text((36, 30), emissao, fontsize=7)
+        page.insert_text((36, 50), "\n".join(conteudo), fontsize=8, lineheight=1.35)
+        page.insert_text((36, 820), f"{LINK}\n{numero}/{total}", fontsize=6)
+    dados = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return dados
+
+
+def gerar_lote(quantidade: int, debitos: int = 5, paginas_extras: int = 0, variantes: int = 50, semente: int = 0) -> list:
+    """
+    Gera um lote de relatórios com combinações variadas de restrições.
+
+    Para lotes grandes, só `variantes` PDFs distintos são gerados e repetidos.
+
+    Returns:
+        Lista de tuplas (bytes, filename).
+    """
+    rng = random.Random(semente)
+    chaves = list(RESTRICOES)
+    distintos = []
+    for i in range(min(quantidade, variantes)):
+        restricoes = rng.sample(chaves, rng.randint(0, 3))
+        distintos.append(gerar_relatorio(semente + i, rng.randint(0, debitos * 2), paginas_extras, restricoes))
+    return [(distintos[i % len(distintos)], f"relatorio_{i:06d}.pdf") for i in range(quantidade)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera relatórios sintéticos do DETRAN-SP em PDF.")
+    parser.add_argument("pasta", help="Pasta onde os PDFs serão gravados.")
+    parser.add_argument("-n", "--quantidade", type=int, default=100)
+    parser.add_argument("--debitos", type=int, default=5, help="Média de multas listadas por relatório.")
+    parser.add_argument("--paginas-extras", type=int, default=0, help="Páginas anexas após o aviso final.")
+    parser.add_argument("--variantes", type=int, default=50, help="Quantidade de PDFs distintos no lote.")
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+    for conteudo, nome in gerar_lote(args.quantidade, args.debitos, args.paginas_extras, args.variantes):
+        with open(os.path.join(args.pasta, nome), "wb") as f:
+            f.write(conteudo)
+
+
+if __name__ == "__main__":
+    main()
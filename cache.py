@@ -0,0 +1,146 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from armazenamento import caminho_padrao, conectar, transacao
+from extrator import VERSAO_EXTRATOR
+
+# --- Cache de Resultados em Disco ---
+
+CAMINHO_PADRAO = caminho_padrao("EXTRATOR_CACHE", "resultados.sqlite")
+TAMANHO_MAXIMO_PADRAO = 256 * 1024 * 1024  # 256 MB
+
+# Os contadores guardam os totais históricos de acertos/falhas e o tamanho ocupado
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    chave TEXT PRIMARY KEY,
+    dados TEXT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    ultimo_acesso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados (ultimo_acesso);
+CREATE TABLE IF NOT EXISTS contadores (
+    nome TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO contadores VALUES ('acertos', 0), ('falhas', 0), ('tamanho_total', 0);
+"""
+
+
+class CacheResultados:
+    """
+    Cache persistente dos dicionários extraídos, indexado pelo SHA-256 do PDF.
+
+    Os resultados ficam em um arquivo SQLite (modo WAL), que pode ser compartilhado
+    entre sessões do Streamlit, processos da CLI e vários processos ao mesmo tempo.
+    A chave inclui VERSAO_EXTRATOR, então mudanças na extração invalidam o cache.
+    Quando o tamanho total passa do limite, os itens acessados há mais tempo são
+    removidos (LRU).
+    """
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        # Contadores desta instância; os totais históricos ficam no banco
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        self._conexao = None
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexao is None:
+            self._conexao = conectar(self.caminho, _ESQUEMA)
+        return self._conexao
+
+    @staticmethod
+    def chave(conteudo: bytes) -> str:
+        """Calcula a chave do cache para o conteúdo de um PDF."""
+        return CacheResultados.chave_do_hash(hashlib.sha256(conteudo).hexdigest())
+
+    @staticmethod
+    def chave_do_hash(sha256: str) -> str:
+        """Chave do cache a partir do SHA-256 (hexadecimal) já calculado do PDF."""
+        return f"{VERSAO_EXTRATOR}:{sha256}"
+
+    def obter(self, chave: str) -> dict | None:
+        """
+        Busca um resultado no cache.
+
+        Args:
+            chave: Chave calculada por CacheResultados.chave.
+
+        Returns:
+            O dicionário extraído, ou None se a chave não estiver no cache.
+        """
+        with self._lock, transacao(self._conectar()) as conexao:
+            linha = conexao.execute("SELECT dados FROM resultados WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                self.falhas += 1
+                conexao.execute("UPDATE contadores SET valor = valor + 1 WHERE nome = 'falhas'")
+            else:
+                self.acertos += 1
+                conexao.execute("UPDATE resultados SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+                conexao.execute("UPDATE contadores SET valor = valor + 1 WHERE nome = 'acertos'")
+        return None if linha is None else json.loads(linha[0])
+
+    def gravar(self, chave: str, dados: dict):
+        """
+        Grava um resultado no cache e remove os itens mais antigos se passar do limite.
+
+        Args:
+            chave: Chave calculada por CacheResultados.chave.
+            dados: Dicionário retornado por extrair_pdf.
+        """
+        serializado = json.dumps(dados, ensure_ascii=False)
+        tamanho = len(serializado.encode("utf-8"))
+        with self._lock, transacao(self._conectar()) as conexao:
+            anterior = conexao.execute("SELECT tamanho FROM resultados WHERE chave = ?", (chave,)).fetchone()
+            conexao.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)",
+                (chave, serializado, tamanho, time.time()),
+            )
+            conexao.execute(
+                "UPDATE contadores SET valor = valor + ? WHERE nome = 'tamanho_total'",
+                (tamanho - (anterior[0] if anterior else 0),),
+            )
+            self._remover_antigos(conexao)
+
+    def _remover_antigos(self, conexao: sqlite3.Connection):
+        # Remove em lotes os itens menos usados até o total caber no limite
+        total = conexao.execute("SELECT valor FROM contadores WHERE nome = 'tamanho_total'").fetchone()[0]
+        while total > self.tamanho_maximo:
+            antigos = conexao.execute(
+                "SELECT chave, tamanho FROM resultados ORDER BY ultimo_acesso LIMIT 100"
+            ).fetchall()
+            if not antigos:
+                break
+            for chave, tamanho in antigos:
+                if total <= self.tamanho_maximo:
+                    break
+                conexao.execute("DELETE FROM resultados WHERE chave = ?", (chave,))
+                total -= tamanho
+        conexao.execute("UPDATE contadores SET valor = ? WHERE nome = 'tamanho_total'", (total,))
+
+    def estatisticas(self) -> dict:
+        """Retorna os contadores da instância e os totais persistidos no banco."""
+        with self._lock:
+            conexao = self._conectar()
+            totais = dict(conexao.execute("SELECT nome, valor FROM contadores").fetchall())
+            itens = conexao.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "acertos_total": totais["acertos"],
+            "falhas_total": totais["falhas"],
+            "itens": itens,
+            "tamanho": totais["tamanho_total"],
+            "tamanho_maximo": self.tamanho_maximo,
+        }
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
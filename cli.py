@@ -0,0 +1,121 @@
+"""
+Extração em lote sem o Streamlit.
+
+Uso:
+    python -m cli relatorios/ lote_*.zip -o dados_detran_extraidos.csv -j 8
+"""
+import argparse
+import logging
+import os
+import sys
+
+from entrada import contar_pdfs_locais, iterar_pdfs_locais, listar_arquivos
+from extrator import DESCRICOES_FALHA, em_quarentena
+from indice import deduplicar
+from memoria import GovernadorMemoria
+from metricas import Metricas
+from processamento import criar_motor, em_ordem
+from saida import COLUNAS_QUARENTENA, ESCRITORES, EscritorCSV, criar_escritor, formato_do_arquivo
+
+
+def _argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Extrai os dados de relatórios de débitos do DETRAN-SP (PDFs soltos ou em ZIPs) para CSV, XLSX ou Parquet.",
+    )
+    parser.add_argument("caminhos", nargs="+", help="Arquivos PDF/ZIP, diretórios ou padrões glob.")
+    parser.add_argument("-o", "--saida", default="dados_detran_extraidos.csv", help="Arquivo de saída.")
+    parser.add_argument("-f", "--formato", choices=sorted(ESCRITORES),
+                        help="Formato de saída (padrão: deduzido da extensão de --saida).")
+    parser.add_argument("-j", "--processos", type=int, default=os.cpu_count() or 1,
+                        help="Número de processos paralelos (1 = sequencial).")
+    parser.add_argument("--cache", default=None,
+                        help="Caminho do cache de resultados (padrão: EXTRATOR_CACHE ou ~/.cache/pdf-to-xlsx-gov).")
+    parser.add_argument("--sem-cache", action="store_true", help="Não consulta nem grava o cache de resultados.")
+    parser.add_argument("--indice", default=None,
+                        help="Caminho do índice de veículos (padrão: EXTRATOR_INDICE ou ~/.cache/pdf-to-xlsx-gov).")
+    parser.add_argument("--sem-indice", action="store_true", help="Não consulta nem grava o índice de veículos.")
+    parser.add_argument("--deduplicar", action="store_true",
+                        help="Mantém só o relatório mais recente de cada veículo (Renavam/Chassi); guarda as linhas em memória até o fim.")
+    parser.add_argument("--limite-memoria", type=float, default=2048,
+                        help="Orçamento de memória em MB; acima dele a leitura espera os processos (0 = sem limite).")
+    parser.add_argument("--tempo-limite", type=float, default=60,
+                        help="Segundos máximos por PDF; os que passam disso vão para a quarentena (0 = sem limite).")
+    parser.add_argument("--ocr", action="store_true",
+                        help="Extrai com OCR (Tesseract) os PDFs sem camada de texto, em processos separados.")
+    parser.add_argument("--processos-ocr", type=int, default=1, help="Número de processos dedicados ao OCR.")
+    parser.add_argument("--quarentena",
+                        help="Grava aqui um CSV com os PDFs que não puderam ser extraídos (nome, categoria da falha e mensagem).")
+    parser.add_argument("--metricas", help="Grava os tempos por arquivo/etapa em JSON lines (.jsonl) ou formato Prometheus (.prom).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    arquivos = listar_arquivos(args.caminhos)
+    total_files = contar_pdfs_locais(arquivos)
+    if total_files == 0:
+        print("Nenhum arquivo PDF encontrado.", file=sys.stderr)
+        return 1
+
+    cache = None
+    if not args.sem_cache:
+        from cache import CacheResultados
+        cache = CacheResultados(args.cache) if args.cache else CacheResultados()
+    indice = None
+    if not args.sem_indice:
+        from indice import IndiceVeiculos
+        indice = IndiceVeiculos(args.indice) if args.indice else IndiceVeiculos()
+
+    print(f"Processando {total_files} arquivo(s) PDF com {args.processos} processo(s)...", file=sys.stderr)
+    metricas = Metricas()
+    governador = GovernadorMemoria(args.limite_memoria)
+    quarentena = []
+
+    # As linhas são gravadas assim que ficam prontas (na ordem de entrada),
+    # sem acumular o lote inteiro em memória (exceto com --deduplicar).
+    formato = args.formato or formato_do_arquivo(args.saida)
+    linhas = []
+    with criar_escritor(formato, args.saida) as escritor, \
+            criar_motor(args.processos, cache=cache, metricas=metricas, governador=governador, indice=indice,
+                        tempo_limite=args.tempo_limite, ocr=args.ocr, processos_ocr=args.processos_ocr) as motor:
+        for i, extracted_data in enumerate(em_ordem(motor.processar(iterar_pdfs_locais(arquivos))), start=1):
+            # PDFs que não puderam ser extraídos ficam fora da saída
+            if em_quarentena(extracted_data):
+                quarentena.append(extracted_data)
+            elif args.deduplicar:
+                linhas.append(extracted_data)
+            else:
+                with metricas.cronometrar("escrita"):
+                    escritor.escrever(extracted_data)
+            with metricas.cronometrar("gc"):
+                governador.coletar_se_necessario()
+            if i % 100 == 0 or i == total_files:
+                print(f"{i}/{total_files} arquivo(s) extraído(s)", file=sys.stderr)
+        if args.deduplicar:
+            mantidas = deduplicar(linhas)
+            with metricas.cronometrar("escrita"):
+                for extracted_data in mantidas:
+                    escritor.escrever(extracted_data)
+            print(f"{len(linhas) - len(mantidas)} relatório(s) de veículos repetidos descartado(s)", file=sys.stderr)
+
+    metricas.registrar_memoria(governador.resumo())
+    metricas.finalizar()
+    if args.metricas:
+        metricas.exportar(args.metricas)
+    if quarentena:
+        print(f"{len(quarentena)} PDF(s) em quarentena:", file=sys.stderr)
+        for categoria, quantidade in sorted(metricas.falhas.items()):
+            print(f"  {DESCRICOES_FALHA.get(categoria, categoria)}: {quantidade}", file=sys.stderr)
+        if args.quarentena:
+            with EscritorCSV(args.quarentena, COLUNAS_QUARENTENA) as relatorio:
+                for dados in quarentena:
+                    relatorio.escrever(dados)
+    print(f"Concluído ({len(quarentena)} em quarentena): {args.saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
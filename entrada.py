@@ -0,0 +1,202 @@
+import glob
+import os
+import zipfile
+import zlib
+
+from extrator import FALHA_CORROMPIDO, FALHA_CRIPTOGRAFADO, falha
+
+# --- Leitura dos Uploads ---
+
+# Erros de um membro de ZIP ilegível: CRC errado ou dados truncados (BadZipFile, zlib.error,
+# EOFError), senha (RuntimeError) ou método de compressão não suportado (NotImplementedError)
+_ERROS_MEMBRO = (zipfile.BadZipFile, zlib.error, EOFError, RuntimeError, NotImplementedError)
+
+
+def _eh_pdf(nome: str) -> bool:
+    return nome.lower().endswith('.pdf')
+
+
+def _eh_zip(nome: str) -> bool:
+    return nome.lower().endswith('.zip')
+
+
+def _falha_membro(member: zipfile.ZipInfo, filename: str, erro: Exception) -> dict:
+    """Linha de falha de um membro do ZIP que não pôde ser lido."""
+    if member.flag_bits & 0x1:
+        return falha(filename, FALHA_CRIPTOGRAFADO, "Arquivo protegido por senha dentro do ZIP")
+    return falha(filename, FALHA_CORROMPIDO, f"Arquivo corrompido dentro do ZIP: {erro}")
+
+
+def _abrir_zip_interno(zip_ref: zipfile.ZipFile, member: zipfile.ZipInfo) -> tuple:
+    """Abre um ZIP interno como fluxo, sem copiar o conteúdo para a memória; retorna (fluxo, ZipFile)."""
+    inner_file = zip_ref.open(member)
+    try:
+        return inner_file, zipfile.ZipFile(inner_file)
+    except BaseException:
+        inner_file.close()
+        raise
+
+
+def _contar_zip(zip_ref: zipfile.ZipFile) -> int:
+    """
+    Conta os PDFs de um ZIP (e dos ZIPs internos) lendo apenas o diretório central.
+
+    Um ZIP interno que não abre conta como um item: _iterar_zip gera uma linha de falha para ele.
+    """
+    total = 0
+    for member in zip_ref.infolist():
+        if member.is_dir():
+            continue
+        if _eh_pdf(member.filename):
+            total += 1
+        elif _eh_zip(member.filename):
+            try:
+                inner_file, inner_zip = _abrir_zip_interno(zip_ref, member)
+            except _ERROS_MEMBRO:
+                total += 1
+                continue
+            with inner_file, inner_zip:
+                total += _contar_zip(inner_zip)
+    return total
+
+
+def _iterar_zip(zip_ref: zipfile.ZipFile, prefixo: str = "", pular: int = 0):
+    """
+    Gera (bytes, filename) para cada PDF do ZIP, descompactando um membro por vez.
+
+    Os `pular` primeiros PDFs não são descompactados; um ZIP interno que só tem PDFs
+    a pular é descartado depois de ler o diretório central dele. Um membro ilegível
+    (corrompido ou protegido por senha) gera (linha de falha, filename) no lugar dos
+    bytes, para que o resto do lote continue.
+    """
+    for member in zip_ref.infolist():
+        if member.is_dir():
+            continue
+        filename = prefixo + member.filename
+        if _eh_pdf(member.filename):
+            if pular:
+                pular -= 1
+                continue
+            try:
+                conteudo = zip_ref.read(member)
+            except _ERROS_MEMBRO as e:
+                yield _falha_membro(member, filename, e), filename
+                continue
+            yield conteudo, filename
+        elif _eh_zip(member.filename):
+            try:
+                inner_file, inner_zip = _abrir_zip_interno(zip_ref, member)
+            except _ERROS_MEMBRO as e:
+                if pular:
+                    pular -= 1
+                else:
+                    yield _falha_membro(member, filename, e), filename
+                continue
+            with inner_file, inner_zip:
+                if pular:
+                    quantidade = _contar_zip(inner_zip)
+                    if quantidade <= pular:
+                        pular -= quantidade
+                        continue
+                yield from _iterar_zip(inner_zip, filename + "/", pular)
+                pular = 0
+
+
+def iterar_pdfs_abertos(arquivos):
+    """
+    Percorre os PDFs de arquivos já abertos, identificados pela extensão do nome.
+
+    Cada membro do ZIP só é lido quando o consumidor pede o próximo item, então a
+    memória ocupada depende de quantos arquivos estão em processamento e não do
+    tamanho do ZIP.
+
+    Args:
+        arquivos: Iterável de tuplas (nome, arquivo binário aberto), ex.: os uploads da API HTTP.
+
+    Yields:
+        Tuplas (bytes, filename); membros ilegíveis de um ZIP vêm como (linha de falha, filename).
+    """
+    for nome, arquivo in arquivos:
+        if _eh_zip(nome):
+            with zipfile.ZipFile(arquivo, 'r') as zip_ref:
+                yield from _iterar_zip(zip_ref)
+        elif _eh_pdf(nome):
+            yield arquivo.read(), nome
+
+
+# --- Leitura de Caminhos Locais (CLI) ---
+
+
+def listar_arquivos(caminhos) -> list:
+    """
+    Expande diretórios (recursivamente) e padrões glob em uma lista de PDFs e ZIPs.
+
+    Args:
+        caminhos: Caminhos de arquivos, diretórios ou padrões como "relatorios/*.zip".
+
+    Returns:
+        Os caminhos dos arquivos .pdf e .zip encontrados, sem repetição.
+    """
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for pasta, subpastas, nomes in os.walk(caminho):
+                subpastas.sort()
+                arquivos.extend(os.path.join(pasta, nome) for nome in sorted(nomes))
+        elif os.path.exists(caminho):
+            arquivos.append(caminho)
+        else:
+            arquivos.extend(sorted(glob.glob(caminho, recursive=True)))
+    return [arquivo for arquivo in dict.fromkeys(arquivos) if _eh_pdf(arquivo) or _eh_zip(arquivo)]
+
+
+def contar_pdfs_locais(arquivos) -> int:
+    """
+    Conta quantos PDFs serão processados, sem extrair nenhum deles.
+
+    Args:
+        arquivos: Caminhos retornados por listar_arquivos.
+
+    Returns:
+        O número total de PDFs, incluindo os que estão dentro de ZIPs (lendo só o diretório central).
+    """
+    total = 0
+    for arquivo in arquivos:
+        if _eh_zip(arquivo):
+            with zipfile.ZipFile(arquivo, 'r') as zip_ref:
+                total += _contar_zip(zip_ref)
+        else:
+            total += 1
+    return total
+
+
+def iterar_pdfs_locais(arquivos, nomes=None, pular: int = 0):
+    """
+    Percorre os PDFs de caminhos locais: cada PDF só é lido do disco quando pedido.
+
+    Args:
+        arquivos: Caminhos retornados por listar_arquivos.
+        nomes: Nomes exibidos para os PDFs soltos, na mesma ordem de `arquivos`
+            (padrão: o próprio caminho). Os PDFs de ZIPs usam o nome do membro.
+        pular: Quantos PDFs do início não são lidos nem gerados (ex.: os já extraídos
+            de um lote retomado). ZIPs inteiros dentro desse trecho só têm o diretório lido.
+
+    Yields:
+        Tuplas (bytes, filename); membros ilegíveis de um ZIP vêm como (linha de falha, filename).
+    """
+    for arquivo, nome in zip(arquivos, nomes or arquivos):
+        if _eh_zip(arquivo):
+            with zipfile.ZipFile(arquivo, 'r') as zip_ref:
+                if pular:
+                    quantidade = _contar_zip(zip_ref)
+                    if quantidade <= pular:
+                        pular -= quantidade
+                        continue
+                yield from _iterar_zip(zip_ref, pular=pular)
+                pular = 0
+        elif pular:
+            pular -= 1
+        else:
+            with open(arquivo, 'rb') as pdf_file:
+                conteudo = pdf_file.read()
+            yield conteudo, nome
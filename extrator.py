@@ -0,0 +1,612 @@
+import importlib
+import re
+import time
+from io import BytesIO
+from typing import Callable, NamedTuple
+
+# Versão da lógica de extração. Deve ser incrementada sempre que uma mudança alterar
+# os dados extraídos, para invalidar os resultados guardados em cache.
+VERSAO_EXTRATOR = 5
+
+# --- Tabela de Campos ---
+
+# Início e fim do trecho relevante do relatório
+MARCADOR_INICIO = 'Marca / Modelo'
+MARCADOR_FIM = 'Este documento é fornecido exclusivamente para fins de conferência simples e não possui validade legal.'
+
+# Padrões removidos do texto antes da extração (link do rodapé e data/hora de emissão).
+PADRAO_LINK = re.compile(r"https://www\.detran\.sp\.gov\.br/detransp/pb/servicos/veiculos/consultar_debitos_restricoes[/W?]id=consultar_debitos_restricoes")
+PADRAO_DATA_HORA = re.compile(r"(\d{2})/(\d{2})/(\d{4}),\s+(\d{2}):(\d{2})")
+
+AVISOS_LICENCIAMENTO = (
+    "Para liberar o pagamento do licenciamento, é preciso que todos os débitos do veículo tenham sido pagos.  Consultar Débitos e Restrições - Detran-SP  2/3",
+    "Aviso sobre o pagamento do licenciamento Você só pode quitar um licenciamento por vez, começando pelo mais atrasado. Após fazer o pagamento, será exibido o próximo ano disponível para pagar, seguindo a ordem do mais antigo ao mais recente.  Consultar Débitos e Restrições - Detran-SP  2/3",
+)
+
+
+def _grupo(match) -> str:
+    return match.group(1)
+
+
+def _texto(match) -> str:
+    return match.group(1).strip().replace('\n', ' ')
+
+
+def clean_currency(match):
+    """Função auxiliar para limpar e formatar valores monetários."""
+    if match:
+        valor = match.group(1)
+        # Remove quebras de linha/espaços não-quebráveis (como \xa0)
+        return valor.strip().replace('\xa0', ' ').replace('\n', ' ')
+    return None
+
+
+def _restricao_financeira(match) -> str:
+    valor = _texto(match)
+    for aviso in AVISOS_LICENCIAMENTO:
+        valor = valor.replace(aviso, "")
+    return valor
+
+
+class Campo(NamedTuple):
+    """
+    Especificação de um campo extraído do texto do PDF.
+
+    Attributes:
+        nome: Nome da coluna no resultado.
+        ancora: Texto literal onde todo match do padrão começa. Usada nos padrões com
+            re.IGNORECASE, que não aproveitam a busca rápida por prefixo literal do re.
+        padrao: Expressão regular já compilada.
+        valor: Função que converte o match no valor da coluna.
+        obrigatorio: Se True, a coluna é preenchida com None quando nada é encontrado.
+        alternativo: Se True, só é tentado quando um campo anterior de mesmo nome não encontrou nada.
+    """
+    nome: str
+    ancora: str | None
+    padrao: re.Pattern
+    valor: Callable = _grupo
+    obrigatorio: bool = False
+    alternativo: bool = False
+
+
+CAMPOS = (
+    Campo('Marca / Modelo', 'Marca / Modelo',
+          re.compile(r"Marca / Modelo\s*(.*?)\s*Cor", re.DOTALL | re.IGNORECASE),
+          lambda m: m.group(1).strip()),
+    Campo('Cor', 'Cor', re.compile(r"Cor\s*(\w+)", re.IGNORECASE)),
+    Campo('Renavam', 'Renavam', re.compile(r"Renavam\s*(\d{11})", re.IGNORECASE)),
+    Campo('Ano fabricação', 'Ano', re.compile(r"Ano\s*fabricação\s*(\d{4})", re.IGNORECASE)),
+    Campo('Chassi', 'Chassi', re.compile(r"Chassi\s*([A-Z0-9]{17})", re.IGNORECASE)),
+    Campo('Ano modelo', 'Ano', re.compile(r"Ano\s*modelo\s*(\d{4})", re.IGNORECASE)),
+    Campo('Tipo', 'Tipo',
+          re.compile(r"Tipo\s*(.*?)\s*Combustível", re.DOTALL | re.IGNORECASE),
+          lambda m: m.group(1).strip()),
+    Campo('Combustível', 'Combustível', re.compile(r"Combustível\s*(\w+)", re.IGNORECASE)),
+    # Débitos
+    Campo('Total IPVA', None,
+          re.compile(r"Total de débitos do IPVA\s*(R\$\s*[\d\.,\s]+)"),
+          clean_currency, obrigatorio=True),
+    Campo('Total Multas (Pix)', None,
+          re.compile(r'Total de débitos que podem ser pagos com Pix\s*(R\$\s*[\d\.,\s]+)'),
+          clean_currency, obrigatorio=True),
+    Campo('Total de débitos fora do sistema estadual de multa', None,
+          re.compile(r'Total de débitos fora do sistema estadual de multa\s*(R\$\s*[\d\.,\s]+)'),
+          clean_currency),
+    # Tentativa de extração alternativa se o valor não for R$
+    Campo('Total de débitos fora do sistema estadual de multa', 'Total de débitos',
+          re.compile(r'Total de débitos fora do sistema estadual de multa\s*(.*?)\s*Licenciamento', re.DOTALL | re.IGNORECASE),
+          _texto, alternativo=True),
+    # Licenciamento: o grupo 2 é o ano de vencimento
+    Campo('Ano Vencimento Licenciamento', 'vencimento do licenciamento',
+          re.compile(r"vencimento do licenciamento\s+(\d{2}/\d{2}/(\d{4}))", re.DOTALL | re.IGNORECASE),
+          lambda m: m.group(2)),
+    Campo('Licenciamento - Total de débitos', None,
+          re.compile(r"Total de débitos\s*(R\$\s*[\d\.,]+)", re.DOTALL),
+          lambda m: m.group(1).strip().replace('\n', ' ').replace('\xa0', ' ')),
+    # Restrições
+    Campo('Bloqueio de Furto/Roubo', None,
+          re.compile(r"Bloqueio de furto/roubo\s*(.*?)\s*Restrição tributária", re.DOTALL),
+          _texto),
+    Campo('Restrição Financeira', None,
+          re.compile(r"Restrição financeira\s*(.*?)\s*Restrição\nadministrativa", re.DOTALL),
+          _restricao_financeira),
+    Campo('Restrição Administrativa', None,
+          re.compile(r"Restrição\nadministrativa\s*(.*?)\s*Restrição judicial", re.DOTALL),
+          _texto),
+    Campo('Restrição Judicial', None,
+          re.compile(r"Restrição judicial\s*(.*?)\s*Restrição por veículo\nguinchado", re.DOTALL),
+          _texto),
+    Campo('Restrição por Veículo Guinchado', None,
+          re.compile(r"Restrição por veículo\nguinchado\s*(.*?)\s*Restrição de gravame", re.DOTALL),
+          _texto),
+)
+
+# Caracteres que o re.IGNORECASE considera equivalentes a letras das âncoras, mas que
+# str.lower() não converte (ı ~ i, ſ ~ s). Se aparecerem, a busca por âncoras é desativada.
+_EQUIVALENTES_IGNORECASE = ('\u0131', '\u017f')
+
+
+# --- Ordem das Colunas ---
+
+default_cols = ["Nome do Arquivo", "Data de Emissão", "Renavam", "Chassi", "Marca / Modelo", "Cor", "Ano fabricação", "Ano modelo", "Tipo", "Combustível"]
+
+
+def ordenar_colunas(colunas) -> list:
+    """
+    Ordena as colunas para melhor visualização: dados do veículo, débitos, restrições, erros e o restante.
+
+    Args:
+        colunas: Nomes das colunas (ex.: df.columns).
+
+    Returns:
+        A lista de colunas na ordem final.
+    """
+    colunas = list(colunas)
+    debt_cols = [col for col in colunas if "Total" in col or "débitos" in col or "Licenciamento" in col]
+    restriction_cols = [col for col in colunas if "Restrição" in col or "Bloqueio" in col]
+    error_cols = [col for col in colunas if "Erro" in col]
+
+    # Cria a ordem final das colunas
+    final_cols = [col for col in default_cols if col in colunas]
+    final_cols.extend([col for col in debt_cols if col not in final_cols])
+    final_cols.extend([col for col in restriction_cols if col not in final_cols])
+    final_cols.extend([col for col in error_cols if col not in final_cols])
+    final_cols.extend([col for col in colunas if col not in final_cols and col not in debt_cols and col not in restriction_cols and col not in error_cols])
+    return final_cols
+
+
+def colunas_saida() -> list:
+    """
+    Todas as colunas que extrair_pdf pode produzir (com os modelos registrados), já na ordem final.
+
+    "Falha" e "Erro" ficam de fora: as linhas com falha vão para a quarentena (ver saida.COLUNAS_QUARENTENA).
+    """
+    colunas = ["Nome do Arquivo"] + [campo.nome for modelo in MODELOS for campo in modelo.campos]
+    return ordenar_colunas(dict.fromkeys(colunas + ['Data de Emissão', 'Páginas Ignoradas', 'Modelo', 'Tempo OCR (s)']))
+
+
+# --- Funções de Extração ---
+
+def _remover_contador_paginas(text: str) -> str:
+    r"""
+    Equivale a re.sub(r"\d+/4", "", text), mas procura "/4" com str.find.
+
+    O re testa o padrão a partir de cada dígito do texto; aqui só as ocorrências de
+    "/4" são examinadas, voltando pelos dígitos anteriores até o fim do último match.
+    """
+    partes = []
+    inicio = 0
+    pos = text.find('/4')
+    while pos != -1:
+        comeco = pos
+        while comeco > inicio and text[comeco - 1].isdecimal():
+            comeco -= 1
+        if comeco < pos:
+            partes.append(text[inicio:comeco])
+            inicio = pos + 2
+            pos = text.find('/4', inicio)
+        else:
+            pos = text.find('/4', pos + 1)
+    if not partes:
+        return text
+    partes.append(text[inicio:])
+    return "".join(partes)
+
+
+def _remover_data_hora(text: str) -> str:
+    """
+    Equivale a PADRAO_DATA_HORA.sub("", text), mas só testa o padrão onde ele pode começar.
+
+    Todo match tem a vírgula exatamente 10 caracteres após o início ("dd/mm/aaaa,").
+    """
+    partes = []
+    inicio = 0
+    virgula = text.find(',', 10)
+    while virgula != -1:
+        comeco = virgula - 10
+        match = PADRAO_DATA_HORA.match(text, comeco) if comeco >= inicio else None
+        if match:
+            partes.append(text[inicio:comeco])
+            inicio = match.end()
+            virgula = text.find(',', inicio + 10)
+        else:
+            virgula = text.find(',', virgula + 1)
+    if not partes:
+        return text
+    partes.append(text[inicio:])
+    return "".join(partes)
+
+
+def limpar_texto(text: str) -> str:
+    """Remove do texto os padrões irrelevantes (links, contadores de página, datas e ícones)."""
+    text = PADRAO_LINK.sub("", text)
+    text = _remover_contador_paginas(text)
+    text = _remover_data_hora(text)
+    return text.replace("content_copy", "") # Assumindo ser um texto gerado pelo ícone
+
+
+# --- Modelos de Documento ---
+
+class Modelo(NamedTuple):
+    """
+    Layout de relatório suportado pelo extrator.
+
+    Attributes:
+        nome: Identificador gravado na coluna "Modelo".
+        identificadores: Textos procurados na primeira página; basta um deles para reconhecer o modelo.
+        marcador_inicio: Início do trecho relevante (se não existir, o texto completo é usado).
+        marcador_fim: Fim do trecho relevante; as páginas seguintes não são lidas.
+        campos: Tabela de Campo extraída do trecho.
+        limpar: Função que remove do trecho os textos irrelevantes (rodapés, contadores de página).
+        padrao_emissao: Data/hora de emissão impressa nas páginas, com os grupos dia, mês, ano, hora
+            e minuto. É procurada na primeira página antes da limpeza, que a remove.
+    """
+    nome: str
+    identificadores: tuple
+    marcador_inicio: str
+    marcador_fim: str
+    campos: tuple
+    limpar: Callable = limpar_texto
+    padrao_emissao: re.Pattern | None = None
+
+
+# O cabeçalho e o link do rodapé aparecem em todas as páginas do relatório
+DETRAN_SP = Modelo(
+    nome="detran-sp",
+    identificadores=("Detran-SP", "detran.sp.gov.br"),
+    marcador_inicio=MARCADOR_INICIO,
+    marcador_fim=MARCADOR_FIM,
+    campos=CAMPOS,
+    padrao_emissao=PADRAO_DATA_HORA,
+)
+
+# Modelos testados em ordem; o primeiro reconhecido é usado
+MODELOS = [DETRAN_SP]
+
+ERRO_MODELO_DESCONHECIDO = "Modelo de documento não reconhecido"
+ERRO_SEM_CAMPOS = "Relatório reconhecido, mas nenhum campo foi encontrado (layout diferente?)"
+
+# Fração da página coberta por imagens a partir da qual ela é tratada como digitalizada
+AREA_DIGITALIZADA = 0.5
+
+
+def registrar_modelo(modelo: Modelo):
+    """Adiciona um modelo ao registro (ou substitui o de mesmo nome). Incremente VERSAO_EXTRATOR junto."""
+    for posicao, registrado in enumerate(MODELOS):
+        if registrado.nome == modelo.nome:
+            MODELOS[posicao] = modelo
+            return
+    MODELOS.append(modelo)
+
+
+def identificar_modelo(primeira_pagina: str) -> Modelo | None:
+    """
+    Escolhe o modelo pelo texto da primeira página, sem extrair o restante do documento.
+
+    Returns:
+        O primeiro modelo registrado com algum identificador na página, ou None.
+    """
+    for modelo in MODELOS:
+        if any(identificador in primeira_pagina for identificador in modelo.identificadores):
+            return modelo
+    return None
+
+
+def ler_emissao(texto: str, modelo: Modelo) -> str | None:
+    """
+    Data/hora de emissão do relatório, usada para saber qual é o mais recente de um veículo.
+
+    Returns:
+        "aaaa-mm-dd hh:mm" (que ordena como texto), ou None se o modelo não tem o padrão
+        ou ele não aparece no texto.
+    """
+    if modelo.padrao_emissao is None:
+        return None
+    match = modelo.padrao_emissao.search(texto)
+    if match is None:
+        return None
+    dia, mes, ano, hora, minuto = match.groups()
+    return f"{ano}-{mes}-{dia} {hora}:{minuto}"
+
+
+# --- Classificação de Falhas ---
+
+# Categorias gravadas na chave "Falha"; as linhas com falha vão para a quarentena
+FALHA_CORROMPIDO = "corrompido"
+FALHA_CRIPTOGRAFADO = "criptografado"
+FALHA_SEM_TEXTO = "sem_texto"
+FALHA_MODELO = "modelo_desconhecido"
+FALHA_LIMITE = "muito_grande"
+FALHA_TEMPO = "tempo_esgotado"
+FALHA_PROCESSO = "processo_encerrado"
+FALHA_EXTRACAO = "erro_extracao"
+
+DESCRICOES_FALHA = {
+    FALHA_CORROMPIDO: "PDF corrompido ou inválido",
+    FALHA_CRIPTOGRAFADO: "PDF protegido por senha",
+    FALHA_SEM_TEXTO: "Sem texto (PDF digitalizado?)",
+    FALHA_MODELO: "Não é um relatório reconhecido",
+    FALHA_LIMITE: "Arquivo ou número de páginas acima do limite",
+    FALHA_TEMPO: "Tempo limite esgotado",
+    FALHA_PROCESSO: "Processo de extração encerrado",
+    FALHA_EXTRACAO: "Erro inesperado na extração",
+}
+
+# Arquivos acima destes limites são recusados antes de qualquer extração de texto
+TAMANHO_MAXIMO_PDF = 50 * 1024 * 1024  # 50 MB
+PAGINAS_MAXIMAS = 500
+
+
+def aquecer():
+    """
+    Importa o PyMuPDF de antemão.
+
+    O import fica dentro de extrair_pdf, para que o processo principal (CLI, app, API)
+    e os módulos que só usam as constantes daqui (cache, índice, saída) não paguem por
+    ele; os pools chamam esta função ao iniciar cada processo, para que o primeiro PDF
+    não pague o import.
+    """
+    importlib.import_module("pymupdf")
+
+
+def falha(filename: str, categoria: str, mensagem: str) -> dict:
+    """Linha de um PDF que não pôde ser extraído."""
+    return {"Nome do Arquivo": filename, "Falha": categoria, "Erro": mensagem}
+
+
+def em_quarentena(dados: dict) -> bool:
+    """True se a linha é de um PDF com falha (vai para o relatório de quarentena, não para a saída)."""
+    return "Falha" in dados
+
+
+def verificar_tamanho(tamanho: int, filename: str, limite_bytes: int = TAMANHO_MAXIMO_PDF) -> dict | None:
+    """Retorna a linha de falha se o PDF passa do limite de tamanho, ou None."""
+    if tamanho <= limite_bytes:
+        return None
+    return falha(filename, FALHA_LIMITE,
+                 f"Arquivo com {tamanho / 1024 / 1024:.1f} MB (limite de {limite_bytes / 1024 / 1024:.0f} MB)")
+
+
+def _posicoes(minusculo: str, ancora: str):
+    # Ocorrências da âncora em ordem crescente, calculadas sob demanda
+    pos = minusculo.find(ancora)
+    while pos != -1:
+        yield pos
+        pos = minusculo.find(ancora, pos + 1)
+
+
+def _buscar(padrao: re.Pattern, text: str, posicoes):
+    # Equivale a padrao.search(text): todo match começa em uma ocorrência da âncora
+    for pos in posicoes:
+        match = padrao.match(text, pos)
+        if match:
+            return match
+    return None
+
+
+def extrair_campos(text: str, campos=CAMPOS) -> dict:
+    """
+    Extrai os campos de um texto já delimitado e limpo.
+
+    Os padrões sem âncora usam search normalmente. Para os que têm âncora, o texto é
+    convertido para minúsculas uma única vez e o padrão só é testado nas posições onde
+    a âncora aparece, em vez de em cada caractere do texto.
+
+    Args:
+        text: Texto do PDF após a limpeza do modelo.
+        campos: Tabela de Campo do modelo (padrão: CAMPOS, do relatório do DETRAN-SP).
+
+    Returns:
+        Um dicionário com os campos encontrados.
+    """
+    data = {}
+    minusculo = None
+
+    for campo in campos:
+        if campo.alternativo and campo.nome in data:
+            continue
+        if campo.ancora is None:
+            match = campo.padrao.search(text)
+        else:
+            if minusculo is None:
+                minusculo = text.lower()
+                # str.lower() pode mudar o tamanho do texto (ex.: "İ"); nesse caso as posições
+                # não batem e a busca volta a ser feita com search no texto original.
+                usar_ancoras = len(minusculo) == len(text) and not any(c in text for c in _EQUIVALENTES_IGNORECASE)
+            if usar_ancoras:
+                match = _buscar(campo.padrao, text, _posicoes(minusculo, campo.ancora.lower()))
+            else:
+                match = campo.padrao.search(text)
+        if match:
+            data[campo.nome] = campo.valor(match)
+        elif campo.obrigatorio:
+            data[campo.nome] = None
+    return data
+
+
+def ler_texto(pagina) -> str:
+    """Texto da camada de texto da página (o padrão de extrair_pdf)."""
+    return pagina.get_text()
+
+
+def delimitar_texto(doc, so_paginas_relevantes: bool = True, modelo=None,
+                    primeira_pagina: str | None = None, ler_pagina: Callable = ler_texto) -> tuple[str, int]:
+    """
+    Extrai o texto entre os marcadores de início e fim do modelo.
+
+    O resultado é o mesmo de juntar o texto de todas as páginas com chr(12) e recortar
+    entre os marcadores, mas as páginas são lidas em ordem e a leitura para assim que o
+    trecho termina: as páginas depois do rodapé nunca passam pelo get_text. Se o
+    marcador de início não existir, o texto completo é usado, como antes.
+
+    Args:
+        doc: Documento aberto com pymupdf.open.
+        so_paginas_relevantes: Se False, extrai o texto de todas as páginas antes de recortar.
+        modelo: Modelo com os marcadores (padrão: DETRAN_SP).
+        primeira_pagina: Texto da primeira página, se já foi extraído (ex.: por identificar_modelo).
+        ler_pagina: Função que retorna o texto de uma página (ex.: com OCR).
+
+    Returns:
+        Tupla (texto, paginas_ignoradas).
+    """
+    modelo = modelo or DETRAN_SP
+    marcador_inicio, marcador_fim = modelo.marcador_inicio, modelo.marcador_fim
+
+    def texto_da_pagina(numero):
+        if numero == 0 and primeira_pagina is not None:
+            return primeira_pagina
+        return ler_pagina(doc[numero])
+
+    if not so_paginas_relevantes:
+        text = chr(12).join([texto_da_pagina(numero) for numero in range(doc.page_count)])
+        find_comeco = text.find(marcador_inicio)
+        find_final = text.find(marcador_fim)
+
+        if find_comeco != -1 and find_final != -1:
+            text = text[find_comeco:find_final]
+        elif find_comeco != -1:
+            text = text[find_comeco:]
+        return text, 0
+
+    total_paginas = doc.page_count
+    anteriores = []     # Páginas lidas antes do marcador de início
+    fim_antes = False   # O rodapé apareceu antes do marcador de início
+    partes = None
+
+    for numero in range(total_paginas):
+        pagina = texto_da_pagina(numero)
+        restantes = total_paginas - numero - 1
+
+        if partes is None:
+            find_comeco = pagina.find(marcador_inicio)
+            if find_comeco == -1:
+                fim_antes = fim_antes or marcador_fim in pagina
+                anteriores.append(pagina)
+                continue
+
+            find_final = pagina.find(marcador_fim)
+            if fim_antes or find_final != -1 and find_final < find_comeco:
+                # Rodapé antes do início: o recorte original resulta em texto vazio
+                return "", restantes
+            if find_final != -1:
+                return pagina[find_comeco:find_final], restantes
+            partes = [pagina[find_comeco:]]
+            anteriores = None
+        else:
+            find_final = pagina.find(marcador_fim)
+            if find_final != -1:
+                partes.append(pagina[:find_final])
+                return chr(12).join(partes), restantes
+            partes.append(pagina)
+
+    if partes is None:
+        return chr(12).join(anteriores), 0
+    return chr(12).join(partes), 0
+
+
+def _digitalizada(pagina) -> bool:
+    """True se as imagens da página cobrem boa parte dela (ex.: um relatório escaneado)."""
+    area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in (info["bbox"] for info in pagina.get_image_info()))
+    return area >= AREA_DIGITALIZADA * pagina.rect.get_area()
+
+
+def extrair_pdf(file_path_or_bytes: str | bytes | BytesIO, filename: str, so_paginas_relevantes: bool = True,
+                tempos: dict | None = None, limite_bytes: int = TAMANHO_MAXIMO_PDF,
+                paginas_maximas: int = PAGINAS_MAXIMAS, ler_pagina: Callable = ler_texto) -> dict:
+    """
+    Extrai dados específicos de um PDF usando regex.
+
+    O modelo do documento é identificado pela primeira página. PDFs grandes demais,
+    corrompidos, protegidos por senha, sem texto ou que nenhum modelo reconhece não
+    passam pelo restante da extração: a linha volta com a categoria em "Falha" (ver
+    falha()) e a mensagem em "Erro". Um relatório reconhecido do qual nenhum campo é
+    extraído volta como "sem texto" (para ir para o OCR) se o trecho não tem texto ou a
+    primeira página é uma imagem, e como "modelo desconhecido" caso contrário.
+
+    Args:
+        file_path_or_bytes: O caminho do arquivo (se salvo localmente), os bytes do PDF ou um objeto BytesIO.
+        filename: O nome original do arquivo para incluir no resultado.
+        so_paginas_relevantes: Se True, só extrai o texto das páginas até o rodapé do relatório.
+        tempos: Dicionário opcional que recebe os segundos gastos em cada etapa
+            ("abrir", "get_text", "limpeza" e "campos").
+        limite_bytes: Tamanho máximo do PDF.
+        paginas_maximas: Número máximo de páginas do PDF.
+        ler_pagina: Função que retorna o texto de uma página (padrão: a camada de texto; ver ocr.py).
+
+    Returns:
+        Um dicionário com os dados extraídos, incluindo quantas páginas não precisaram ser lidas.
+    """
+    import pymupdf
+
+    data = {"Nome do Arquivo": filename}
+
+    # pymupdf.open aceita o caminho do arquivo (str) ou o conteúdo (bytes)
+    # Se for um BytesIO, precisamos ler o conteúdo em bytes.
+    if isinstance(file_path_or_bytes, BytesIO):
+        doc_content = file_path_or_bytes.read()
+    else:
+        doc_content = file_path_or_bytes # Bytes crus (vindos do pool de processos) ou o caminho (str)
+
+    if isinstance(doc_content, (bytes, bytearray)):
+        grande_demais = verificar_tamanho(len(doc_content), filename, limite_bytes)
+        if grande_demais:
+            return grande_demais
+
+    relogio = time.perf_counter
+    try:
+        t_inicio = relogio()
+        try:
+            doc = pymupdf.open(stream=doc_content, filetype="pdf")
+        except pymupdf.FileDataError as e:
+            return falha(filename, FALHA_CORROMPIDO, f"PDF corrompido ou inválido: {e}")
+        with doc:
+            t_aberto = relogio()
+
+            # 1. Verificações Rápidas e Identificação do Modelo pela Primeira Página
+            if doc.needs_pass:
+                return falha(filename, FALHA_CRIPTOGRAFADO, "PDF protegido por senha")
+            if doc.page_count > paginas_maximas:
+                return falha(filename, FALHA_LIMITE, f"PDF com {doc.page_count} páginas (limite de {paginas_maximas})")
+            primeira_pagina = ler_pagina(doc[0]) if doc.page_count else ""
+            modelo = identificar_modelo(primeira_pagina)
+            if modelo is None:
+                if tempos is not None:
+                    tempos.update(abrir=t_aberto - t_inicio, get_text=relogio() - t_aberto)
+                if not primeira_pagina.strip():
+                    return falha(filename, FALHA_SEM_TEXTO, "Nenhum texto na primeira página (PDF digitalizado?)")
+                return falha(filename, FALHA_MODELO, ERRO_MODELO_DESCONHECIDO)
+
+            # 2. Delimitação do Texto Relevante
+            text, paginas_ignoradas = delimitar_texto(doc, so_paginas_relevantes, modelo, primeira_pagina, ler_pagina)
+            t_texto = relogio()
+
+            # 3. Limpeza de Padrões Irrelevantes
+            text = modelo.limpar(text)
+            t_limpo = relogio()
+
+            # 4. Extração dos Campos com Regex
+            campos = extrair_campos(text, modelo.campos)
+            emissao = ler_emissao(primeira_pagina, modelo)
+            sem_campos = all(valor is None for valor in campos.values())
+            # Sem campos, o PDF é tratado como digitalizado se o trecho não tem texto ou a página é uma imagem
+            digitalizado = sem_campos and (not text.strip() or _digitalizada(doc[0]))
+            t_campos = relogio()
+
+        if tempos is not None:
+            tempos.update(abrir=t_aberto - t_inicio, get_text=t_texto - t_aberto,
+                          limpeza=t_limpo - t_texto, campos=t_campos - t_limpo)
+        if sem_campos:
+            if digitalizado:
+                # O modelo foi reconhecido pelo cabeçalho/rodapé que o navegador grava como texto
+                # sobre uma digitalização, mas o relatório em si não tem camada de texto
+                return falha(filename, FALHA_SEM_TEXTO, "Nenhum campo no texto do relatório (PDF digitalizado?)")
+            return falha(filename, FALHA_MODELO, ERRO_SEM_CAMPOS)
+        data.update(campos)
+        data['Páginas Ignoradas'] = paginas_ignoradas
+        data['Modelo'] = modelo.nome
+        if emissao:
+            data['Data de Emissão'] = emissao
+        return data
+
+    except Exception as e:
+        return falha(filename, FALHA_EXTRACAO, f"Falha na extração: {e}")
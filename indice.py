@@ -0,0 +1,207 @@
+"""
+Índice persistente de veículos por Renavam/Chassi.
+
+Consulta pela linha de comando:
+    python -m indice --renavam 12345678901
+    python -m indice --chassi 9BWZZZ377VT004251
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from armazenamento import caminho_padrao, conectar, transacao
+from extrator import VERSAO_EXTRATOR
+
+if TYPE_CHECKING:
+    from registros import Relatorio
+
+# --- Índice de Veículos ---
+
+CAMINHO_PADRAO = caminho_padrao("EXTRATOR_INDICE", "indice.sqlite")
+
+
+def chave_veiculo(dados: dict) -> str | None:
+    """
+    Identifica o veículo de uma linha extraída.
+
+    Returns:
+        "renavam:<Renavam>", ou "chassi:<Chassi>" quando o Renavam não foi extraído,
+        ou None se a linha não tem nenhum dos dois (ex.: falha na extração).
+    """
+    if dados.get("Renavam"):
+        return f"renavam:{dados['Renavam']}"
+    if dados.get("Chassi"):
+        return f"chassi:{dados['Chassi'].upper()}"
+    return None
+
+
+def posicoes_mais_recentes(linhas) -> set:
+    """
+    Posições das linhas que sobram ao colapsar os veículos repetidos de um lote.
+
+    Para cada veículo fica só o relatório de "Data de Emissão" mais recente (no empate,
+    ou sem data, o último na ordem de entrada); linhas sem Renavam nem Chassi são sempre
+    mantidas. Percorre as linhas uma única vez, então pode receber um gerador (ex.: a
+    leitura de um checkpoint).
+    """
+    mais_recente = {}
+    sem_chave = set()
+    for posicao, dados in enumerate(linhas):
+        chave = chave_veiculo(dados)
+        if chave is None:
+            sem_chave.add(posicao)
+            continue
+        # A data ("aaaa-mm-dd hh:mm") ordena como texto; sem data, o relatório perde para qualquer outro
+        candidato = (dados.get("Data de Emissão") or "", posicao)
+        if chave not in mais_recente or candidato > mais_recente[chave]:
+            mais_recente[chave] = candidato
+    return sem_chave | {posicao for _, posicao in mais_recente.values()}
+
+
+def deduplicar(linhas) -> list:
+    """Versão em memória de posicoes_mais_recentes: retorna as linhas mantidas, na ordem original."""
+    linhas = list(linhas)
+    manter = posicoes_mais_recentes(linhas)
+    return [dados for posicao, dados in enumerate(linhas) if posicao in manter]
+
+
+# Versão do esquema do banco (PRAGMA user_version); bancos de outra versão são recriados,
+# já que o índice é refeito à medida que os PDFs são extraídos de novo
+_VERSAO_ESQUEMA = 2
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS arquivos (
+    sha256 TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL,
+    veiculo TEXT
+);
+CREATE TABLE IF NOT EXISTS veiculos (
+    chave TEXT PRIMARY KEY,
+    renavam TEXT,
+    chassi TEXT,
+    sha256 TEXT NOT NULL,
+    emissao TEXT NOT NULL,
+    visto_em REAL NOT NULL,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_veiculos_renavam ON veiculos (renavam);
+CREATE INDEX IF NOT EXISTS idx_veiculos_chassi ON veiculos (chassi);
+"""
+
+
+class IndiceVeiculos:
+    """
+    Índice em SQLite do relatório mais recente de cada veículo (por Renavam ou Chassi).
+
+    Guarda a linha do relatório mais recente de cada veículo, consultável sem abrir
+    nenhum PDF, e o veículo de cada PDF já indexado (pelo SHA-256 do conteúdo). As
+    linhas de cada PDF ficam só no CacheResultados, que tem limite de tamanho: o índice
+    cresce com o número de veículos, e não com o de relatórios.
+
+    O relatório "mais recente" é o de data de emissão mais nova: reenviar um PDF antigo
+    não substitui o relatório mais novo do mesmo veículo.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conexao = None
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexao is None:
+            self._conexao = conectar(self.caminho, _ESQUEMA, _VERSAO_ESQUEMA, descartar=("arquivos", "veiculos"))
+        return self._conexao
+
+    def contem(self, sha256: str) -> bool:
+        """True se o PDF (pelo SHA-256 do conteúdo) já foi indexado pela VERSAO_EXTRATOR atual."""
+        with self._lock:
+            linha = self._conectar().execute(
+                "SELECT 1 FROM arquivos WHERE sha256 = ? AND versao = ?", (sha256, VERSAO_EXTRATOR)
+            ).fetchone()
+        return linha is not None
+
+    def registrar(self, sha256: str, dados: dict):
+        """
+        Registra o veículo de um PDF e, se o relatório for o mais recente, a linha do veículo.
+
+        Args:
+            sha256: SHA-256 (hexadecimal) do conteúdo do PDF.
+            dados: Dicionário retornado por extrair_pdf (linhas com "Erro" não devem ser registradas).
+        """
+        veiculo = chave_veiculo(dados)
+        emissao = dados.get("Data de Emissão") or ""
+        with self._lock, transacao(self._conectar()) as conexao:
+            conexao.execute("INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?)", (sha256, VERSAO_EXTRATOR, veiculo))
+            if veiculo is not None:
+                atual = conexao.execute("SELECT emissao FROM veiculos WHERE chave = ?", (veiculo,)).fetchone()
+                if atual is None or atual[0] <= emissao:
+                    conexao.execute(
+                        "INSERT OR REPLACE INTO veiculos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (veiculo, dados.get("Renavam"), (dados.get("Chassi") or "").upper() or None,
+                         sha256, emissao, time.time(), json.dumps(dados, ensure_ascii=False)),
+                    )
+
+    def consultar(self, renavam: str | None = None, chassi: str | None = None) -> "Relatorio | None":
+        """
+        Relatório mais recente de um veículo, sem reprocessar PDFs.
+
+        Args:
+            renavam: Renavam com 11 dígitos.
+            chassi: Chassi com 17 caracteres (maiúsculas ou minúsculas).
+
+        Returns:
+            O Relatorio (valores já convertidos) do relatório mais recente, ou None se o
+            veículo não está no índice.
+        """
+        from registros import Relatorio
+
+        if renavam:
+            coluna, parametro = "renavam", renavam
+        elif chassi:
+            coluna, parametro = "chassi", chassi.upper()
+        else:
+            raise ValueError("Informe o Renavam ou o Chassi.")
+        with self._lock:
+            linha = self._conectar().execute(
+                f"SELECT dados FROM veiculos WHERE {coluna} = ? ORDER BY emissao DESC, visto_em DESC LIMIT 1",
+                (parametro,),
+            ).fetchone()
+        return None if linha is None else Relatorio.de_dict(json.loads(linha[0]))
+
+    def estatisticas(self) -> dict:
+        """Retorna quantos arquivos e veículos estão no índice."""
+        with self._lock:
+            conexao = self._conectar()
+            arquivos = conexao.execute("SELECT COUNT(*) FROM arquivos").fetchone()[0]
+            veiculos = conexao.execute("SELECT COUNT(*) FROM veiculos").fetchone()[0]
+        return {"arquivos": arquivos, "veiculos": veiculos}
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m indice", description="Consulta o relatório mais recente de um veículo no índice.")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--renavam")
+    grupo.add_argument("--chassi")
+    parser.add_argument("--indice", default=CAMINHO_PADRAO, help="Caminho do índice (padrão: EXTRATOR_INDICE ou ~/.cache/pdf-to-xlsx-gov).")
+    args = parser.parse_args(argv)
+
+    relatorio = IndiceVeiculos(args.indice).consultar(renavam=args.renavam, chassi=args.chassi)
+    if relatorio is None:
+        print("Veículo não encontrado no índice.", file=sys.stderr)
+        return 1
+    print(json.dumps({**relatorio.para_dict(), "Com restrição": relatorio.tem_restricao}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+
+from armazenamento import caminho_padrao
+from entrada import contar_pdfs_locais, iterar_pdfs_locais
+from extrator import em_quarentena
+from indice import posicoes_mais_recentes
+from memoria import GovernadorMemoria
+from metricas import Metricas
+from processamento import criar_motor, em_ordem
+from saida import COLUNAS_QUARENTENA, ESCRITORES, EscritorCSV, criar_escritor
+
+logger = logging.getLogger(__name__)
+
+# --- Fila de Lotes em Segundo Plano ---
+
+PASTA_PADRAO = caminho_padrao("EXTRATOR_LOTES", "lotes")
+
+NA_FILA = "na_fila"
+PROCESSANDO = "processando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+
+# Frequência com que o progresso é gravado no estado.json (o checkpoint em si é por linha)
+_SALVAR_ESTADO_A_CADA = 50
+
+# Formato dos ids gerados por enviar() (também o nome da pasta do lote no spool)
+_PADRAO_ID_LOTE = re.compile(r"[0-9a-f]{12}")
+
+
+def _ler_checkpoint(caminho: str) -> int:
+    """
+    Conta as linhas completas do checkpoint.
+
+    Uma última linha sem quebra de linha (gravação interrompida) é descartada do arquivo.
+    """
+    if not os.path.exists(caminho):
+        return 0
+    completas = 0
+    tamanho_valido = 0
+    with open(caminho, "rb+") as f:
+        for linha in f:
+            if not linha.endswith(b"\n"):
+                break
+            completas += 1
+            tamanho_valido += len(linha)
+        f.truncate(tamanho_valido)
+    return completas
+
+
+class FilaLotes:
+    """
+    Processa lotes de PDFs em threads de fundo, fora do ciclo de execução do Streamlit.
+
+    Cada lote enviado é copiado para uma pasta própria (spool) com os arquivos de
+    entrada e um estado.json. As linhas extraídas são gravadas em linhas.jsonl assim que
+    ficam prontas, na ordem de entrada; se o processo for encerrado, o lote é retomado
+    na próxima inicialização a partir da primeira linha que falta. Ao final, o arquivo
+    de saída é gerado a partir do checkpoint, e os PDFs que não puderam ser extraídos
+    vão para quarentena.csv (nome, categoria da falha e mensagem).
+
+    A fila é compartilhada pelo processo inteiro: o app só envia lotes e consulta o
+    estado, então interagir com a página ou perder a conexão não interrompe nada.
+    """
+
+    def __init__(self, pasta: str = PASTA_PADRAO, lotes_simultaneos: int = 1, cache=None, indice=None):
+        """
+        Args:
+            pasta: Pasta onde os lotes são gravados.
+            lotes_simultaneos: Quantos lotes são processados ao mesmo tempo (cada um com seu pool de processos).
+            cache: CacheResultados opcional, usado pelos lotes enviados com usar_cache=True.
+            indice: IndiceVeiculos opcional, usado pelos lotes enviados com usar_cache=True.
+        """
+        self.pasta = pasta
+        self.cache = cache
+        self.indice = indice
+        os.makedirs(pasta, exist_ok=True)
+        self._fila = queue.Queue()
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._progresso = {}
+        # Threads daemon: ao encerrar o servidor, o lote em andamento é retomado depois
+        self._threads = [
+            threading.Thread(target=self._trabalhar, name=f"lote-{n}", daemon=True)
+            for n in range(lotes_simultaneos)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._retomar()
+
+    # --- Estado em disco ---
+
+    def _pasta_lote(self, lote_id: str) -> str:
+        # Os ids vêm de uuid4().hex; qualquer outro texto (ex.: vindo da URL do app) é recusado
+        if not _PADRAO_ID_LOTE.fullmatch(lote_id):
+            raise ValueError(f"Id de lote inválido: {lote_id!r}")
+        return os.path.join(self.pasta, lote_id)
+
+    def _ler_estado(self, lote_id: str) -> dict:
+        with open(os.path.join(self._pasta_lote(lote_id), "estado.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _gravar_estado(self, estado: dict):
+        estado["atualizado"] = time.time()
+        caminho = os.path.join(self._pasta_lote(estado["id"]), "estado.json")
+        with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(estado, f, ensure_ascii=False)
+        os.replace(caminho + ".tmp", caminho)
+
+    def _retomar(self):
+        """Recoloca na fila os lotes que não terminaram na execução anterior."""
+        for estado in sorted(self.listar(), key=lambda estado: estado["criado"]):
+            if estado["status"] in (NA_FILA, PROCESSANDO):
+                logger.info("Retomando o lote %s (%d/%d)", estado["id"], estado["concluidos"], estado["total"])
+                self._fila.put(estado["id"])
+
+    # --- API ---
+
+    def enviar(self, uploads, formato: str = "csv", processos: int | None = None,
+               usar_cache: bool = True, limite_memoria_mb: float | None = None, deduplicar: bool = False,
+               tempo_limite: float | None = 60, ocr: bool = False) -> str:
+        """
+        Copia os arquivos para o spool e coloca o lote na fila.
+
+        Args:
+            uploads: Iterável de tuplas (nome, arquivo) com os PDFs/ZIPs (bytes ou objetos com read()).
+            formato: Formato do arquivo de saída (chave de ESCRITORES).
+            processos: Processos paralelos da extração (1 = sequencial; None = todos os núcleos).
+            usar_cache: Se o lote consulta e grava o cache de resultados e o índice de veículos.
+            limite_memoria_mb: Orçamento de memória do GovernadorMemoria.
+            deduplicar: Se o arquivo de saída mantém só o relatório mais recente de cada veículo.
+            tempo_limite: Segundos máximos por PDF; os que passam disso vão para a quarentena (None = sem limite).
+            ocr: Se os PDFs sem camada de texto são extraídos com OCR (em um processo separado).
+
+        Returns:
+            O identificador do lote.
+        """
+        lote_id = uuid.uuid4().hex[:12]
+        pasta_entrada = os.path.join(self._pasta_lote(lote_id), "entrada")
+        arquivos = []
+        for n, (nome, arquivo) in enumerate(uploads):
+            nome = os.path.basename(nome)
+            if not nome.lower().endswith((".pdf", ".zip")):
+                continue
+            destino = os.path.join(pasta_entrada, str(n), nome)
+            os.makedirs(os.path.dirname(destino))
+            with open(destino, "wb") as f:
+                if isinstance(arquivo, (bytes, bytearray)):
+                    f.write(arquivo)
+                else:
+                    arquivo.seek(0)
+                    shutil.copyfileobj(arquivo, f)
+            arquivos.append({"caminho": os.path.relpath(destino, self._pasta_lote(lote_id)), "nome": nome})
+
+        os.makedirs(self._pasta_lote(lote_id), exist_ok=True)
+        caminhos = [os.path.join(self._pasta_lote(lote_id), arquivo["caminho"]) for arquivo in arquivos]
+        estado = {
+            "id": lote_id,
+            "status": NA_FILA,
+            "criado": time.time(),
+            "formato": formato,
+            "processos": processos,
+            "usar_cache": usar_cache,
+            "limite_memoria_mb": limite_memoria_mb,
+            "deduplicar": deduplicar,
+            "tempo_limite": tempo_limite,
+            "ocr": ocr,
+            "arquivos": arquivos,
+            "total": contar_pdfs_locais(caminhos),
+            "concluidos": 0,
+            "erro": None,
+            "metricas": None,
+        }
+        self._gravar_estado(estado)
+        self._fila.put(lote_id)
+        return lote_id
+
+    def estado(self, lote_id: str) -> dict:
+        """Estado do lote, com o progresso atualizado em memória enquanto ele roda."""
+        estado = self._ler_estado(lote_id)
+        with self._lock:
+            estado["concluidos"] = self._progresso.get(lote_id, estado["concluidos"])
+        return estado
+
+    def listar(self) -> list:
+        """Estados de todos os lotes do spool, do mais recente para o mais antigo."""
+        estados = []
+        for lote_id in os.listdir(self.pasta):
+            try:
+                estados.append(self.estado(lote_id))
+            except (OSError, ValueError):
+                continue  # Pasta incompleta (lote ainda sendo copiado) ou estranha ao spool
+        return sorted(estados, key=lambda estado: estado["criado"], reverse=True)
+
+    def linhas(self, lote_id: str) -> list:
+        """Linhas já extraídas do lote, na ordem de entrada."""
+        checkpoint = os.path.join(self._pasta_lote(lote_id), "linhas.jsonl")
+        if not os.path.exists(checkpoint):
+            return []
+        with open(checkpoint, encoding="utf-8") as f:
+            return [json.loads(linha) for linha in f]
+
+    def caminho_saida(self, lote_id: str) -> str | None:
+        """Arquivo de saída do lote, ou None se ele ainda não terminou."""
+        estado = self._ler_estado(lote_id)
+        if estado["status"] != CONCLUIDO:
+            return None
+        return os.path.join(self._pasta_lote(lote_id), "saida" + ESCRITORES[estado["formato"]].extensao)
+
+    def caminho_quarentena(self, lote_id: str) -> str:
+        """Relatório CSV dos PDFs que não puderam ser extraídos (gerado ao final do lote)."""
+        return os.path.join(self._pasta_lote(lote_id), "quarentena.csv")
+
+    def caminho_metricas(self, lote_id: str, extensao: str = ".jsonl") -> str:
+        """Métricas exportadas ao final do lote (.jsonl ou .prom); cobrem só a última execução se ele foi retomado."""
+        return os.path.join(self._pasta_lote(lote_id), "metricas" + extensao)
+
+    def remover(self, lote_id: str):
+        """Apaga o lote do spool (lotes na fila ou em andamento não podem ser removidos)."""
+        if self.estado(lote_id)["status"] in (NA_FILA, PROCESSANDO):
+            raise ValueError(f"O lote {lote_id} ainda não terminou.")
+        shutil.rmtree(self._pasta_lote(lote_id))
+
+    def fechar(self):
+        """Pede para as threads pararem após a linha atual; os lotes pendentes ficam para a próxima execução."""
+        self._parar.set()
+
+    # --- Processamento ---
+
+    def _trabalhar(self):
+        while not self._parar.is_set():
+            try:
+                lote_id = self._fila.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self._processar(lote_id)
+            except Exception as e:
+                logger.exception("Falha no lote %s", lote_id)
+                estado = self._ler_estado(lote_id)
+                estado.update(status=FALHOU, erro=str(e))
+                self._gravar_estado(estado)
+            finally:
+                with self._lock:
+                    self._progresso.pop(lote_id, None)
+
+    def _processar(self, lote_id: str):
+        pasta = self._pasta_lote(lote_id)
+        estado = self._ler_estado(lote_id)
+        checkpoint = os.path.join(pasta, "linhas.jsonl")
+        concluidos = _ler_checkpoint(checkpoint)
+        estado.update(status=PROCESSANDO, concluidos=concluidos)
+        self._gravar_estado(estado)
+
+        # As linhas já gravadas correspondem aos primeiros PDFs da entrada
+        caminhos = [os.path.join(pasta, arquivo["caminho"]) for arquivo in estado["arquivos"]]
+        nomes = [arquivo["nome"] for arquivo in estado["arquivos"]]
+        entradas = iterar_pdfs_locais(caminhos, nomes, pular=concluidos)
+
+        metricas = Metricas()
+        governador = GovernadorMemoria(estado["limite_memoria_mb"])
+        cache = self.cache if estado["usar_cache"] else None
+        indice = self.indice if estado["usar_cache"] else None
+        with open(checkpoint, "a", encoding="utf-8") as f, \
+                criar_motor(estado["processos"], cache=cache, metricas=metricas, governador=governador,
+                            indice=indice, tempo_limite=estado.get("tempo_limite"),
+                            ocr=estado.get("ocr", False)) as motor:
+            for concluidos, dados in enumerate(em_ordem(motor.processar(entradas)), start=concluidos + 1):
+                f.write(json.dumps(dados, ensure_ascii=False) + "\n")
+                f.flush()
+                with self._lock:
+                    self._progresso[lote_id] = concluidos
+                if concluidos % _SALVAR_ESTADO_A_CADA == 0:
+                    estado["concluidos"] = concluidos
+                    self._gravar_estado(estado)
+                with metricas.cronometrar("gc"):
+                    governador.coletar_se_necessario()
+                if self._parar.is_set():
+                    estado["concluidos"] = concluidos
+                    self._gravar_estado(estado)
+                    return
+
+        # O arquivo de saída é gerado de uma vez a partir do checkpoint; os PDFs com
+        # falha vão para quarentena.csv em vez da saída
+        manter = None
+        if estado.get("deduplicar"):
+            with open(checkpoint, encoding="utf-8") as f:
+                manter = posicoes_mais_recentes(json.loads(linha) for linha in f)
+        saida = os.path.join(pasta, "saida" + ESCRITORES[estado["formato"]].extensao)
+        with criar_escritor(estado["formato"], saida) as escritor, open(checkpoint, encoding="utf-8") as f, \
+                EscritorCSV(self.caminho_quarentena(lote_id), COLUNAS_QUARENTENA) as quarentena:
+            for posicao, linha in enumerate(f):
+                dados = json.loads(linha)
+                if em_quarentena(dados):
+                    quarentena.escrever(dados)
+                elif manter is None or posicao in manter:
+                    with metricas.cronometrar("escrita"):
+                        escritor.escrever(dados)
+
+        metricas.registrar_memoria(governador.resumo())
+        metricas.finalizar()
+        metricas.exportar(os.path.join(pasta, "metricas.jsonl"))
+        metricas.exportar(os.path.join(pasta, "metricas.prom"))
+        estado.update(status=CONCLUIDO, concluidos=_ler_checkpoint(checkpoint), quarentena=quarentena.linhas,
+                      metricas=metricas.resumo())
+        self._gravar_estado(estado)
@@ -0,0 +1,123 @@
+import gc
+import os
+import sys
+
+# --- Controle de Memória ---
+
+_TAMANHO_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Depois de uma coleta, o RSS precisa crescer esta fração do limite para o governador agir
+# de novo: o RSS raramente volta a cair após um pico (pymalloc, o processo compartilhado do
+# Streamlit), e sem essa margem o gc.collect() voltaria a rodar a cada arquivo.
+MARGEM_COLETA = 0.10
+
+
+def rss_atual() -> int:
+    """
+    Memória residente (RSS) do processo atual, em bytes.
+
+    Lê /proc/self/statm no Linux; em outros sistemas usa o pico informado por
+    getrusage, que é o melhor valor disponível sem dependências extras (0 no Windows).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _TAMANHO_PAGINA
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class GovernadorMemoria:
+    """
+    Acompanha a memória de um lote e só age quando o orçamento é ultrapassado.
+
+    O motor informa quantos bytes de PDF estão em voo (lidos e ainda não extraídos)
+    e consulta o governador antes de ler o próximo arquivo: acima do limite, ele espera
+    os processos terminarem (contrapressão) em vez de continuar descompactando. O
+    gc.collect() só roda quando o RSS passa do limite, e não a cada arquivo; depois
+    de uma coleta, o RSS só volta a contar quando cresce MARGEM_COLETA do limite
+    acima do valor medido logo após ela (histerese).
+
+    O RSS medido é o do processo principal; cada processo do pool guarda um PDF por vez.
+    """
+
+    def __init__(self, limite_mb: float | None = None, limite_em_voo_mb: float | None = None):
+        """
+        Args:
+            limite_mb: Orçamento de RSS do processo principal. None desativa o limite.
+            limite_em_voo_mb: Máximo de bytes de PDF aguardando extração. Por padrão, 1/4 de limite_mb.
+        """
+        self.limite = int(limite_mb * 1024 * 1024) if limite_mb else None
+        if limite_em_voo_mb:
+            self.limite_em_voo = int(limite_em_voo_mb * 1024 * 1024)
+        else:
+            self.limite_em_voo = self.limite // 4 if self.limite else None
+        self.em_voo = 0
+        self.pico_em_voo = 0
+        self.pico_rss = rss_atual()
+        self.margem = int(self.limite * MARGEM_COLETA) if self.limite else 0
+        self.coletas = 0
+        self.esperas = 0
+        self._rss_apos_coleta = 0
+        self._esperando = False
+
+    def reservar(self, tamanho: int):
+        """Registra um PDF lido que ainda não foi extraído."""
+        self.em_voo += tamanho
+        self.pico_em_voo = max(self.pico_em_voo, self.em_voo)
+
+    def liberar(self, tamanho: int):
+        """Registra que o PDF foi extraído e o buffer pode ser descartado."""
+        self.em_voo -= tamanho
+
+    def amostrar(self) -> int:
+        """Lê o RSS atual e atualiza o pico do lote."""
+        rss = rss_atual()
+        self.pico_rss = max(self.pico_rss, rss)
+        return rss
+
+    def _rss_acima(self, rss: int) -> bool:
+        # Acima do limite e crescendo desde a última coleta
+        return self.limite is not None and rss > self.limite and rss > self._rss_apos_coleta + self.margem
+
+    def acima_do_limite(self) -> bool:
+        """True se os bytes em voo passaram do orçamento, ou o RSS passou e cresceu desde a última coleta."""
+        rss = self.amostrar()
+        if self.limite_em_voo is not None and self.em_voo > self.limite_em_voo:
+            return True
+        return self._rss_acima(rss)
+
+    def aguardar(self) -> bool:
+        """Indica ao motor se deve esperar resultados antes de ler mais arquivos."""
+        acima = self.acima_do_limite()
+        if acima and not self._esperando:
+            # Conta os períodos de espera, não cada consulta do motor durante eles
+            self.esperas += 1
+        self._esperando = acima
+        return acima
+
+    def coletar_se_necessario(self) -> bool:
+        """Roda gc.collect() apenas se o RSS passou do limite e cresceu desde a última coleta. Retorna True se coletou."""
+        if not self._rss_acima(self.amostrar()):
+            return False
+        gc.collect()
+        self.coletas += 1
+        self._rss_apos_coleta = self.amostrar()
+        return True
+
+    def resumo(self) -> dict:
+        """Pico de memória do lote e quantas vezes o governador precisou agir."""
+        self.amostrar()
+        return {
+            "pico_rss_mb": self.pico_rss / 1024 / 1024,
+            "pico_em_voo_mb": self.pico_em_voo / 1024 / 1024,
+            "limite_mb": self.limite / 1024 / 1024 if self.limite else None,
+            "coletas": self.coletas,
+            "esperas": self.esperas,
+        }
@@ -0,0 +1,189 @@
+import heapq
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# --- Instrumentação das Etapas ---
+
+# Etapas medidas dentro de extrair_pdf (por arquivo)
+ETAPAS_ARQUIVO = ("abrir", "get_text", "limpeza", "campos")
+# Etapas medidas no laço de processamento (por lote)
+ETAPAS_LOTE = ("leitura", "cache", "escrita", "gc")
+
+
+def medir(extrator, conteudo: bytes, filename: str):
+    """
+    Executa o extrator coletando os tempos de cada etapa.
+
+    Roda dentro dos processos do pool, por isso é uma função de módulo. O extrator
+    precisa aceitar o argumento `tempos` (como extrair_pdf).
+
+    Returns:
+        Tupla (dados, tempos) com os tempos em segundos, incluindo o "total".
+    """
+    tempos = {}
+    inicio = time.perf_counter()
+    dados = extrator(conteudo, filename, tempos=tempos)
+    tempos["total"] = time.perf_counter() - inicio
+    return dados, tempos
+
+
+class Metricas:
+    """
+    Coleta os tempos por arquivo e por etapa de um lote.
+
+    O motor de processamento registra os tempos de cada PDF (medidos no processo que o
+    extraiu) e das etapas do laço (leitura do ZIP, consulta ao cache); o app e a CLI
+    registram as etapas que controlam (escrita da saída, coleta de lixo).
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.arquivos = []
+        self.totais = dict.fromkeys(ETAPAS_ARQUIVO + ETAPAS_LOTE, 0.0)
+        self.acertos_cache = 0
+        self.arquivos_ocr = 0
+        self.segundos_ocr = 0.0
+        self.memoria = {}
+        self.falhas = {}
+
+    def registrar_arquivo(self, filename: str, tempos: dict, tamanho: int, cache: bool = False, ocr: bool = False):
+        """Registra os tempos de um PDF (tempos vazio quando veio do cache; ocr quando foi extraído com OCR)."""
+        registro = {"arquivo": filename, "bytes": tamanho, "cache": cache, "ocr": ocr, "total": tempos.get("total", 0.0)}
+        for etapa in ETAPAS_ARQUIVO:
+            segundos = tempos.get(etapa, 0.0)
+            registro[etapa] = segundos
+            self.totais[etapa] += segundos
+        self.acertos_cache += cache
+        if ocr:
+            self.arquivos_ocr += 1
+            self.segundos_ocr += registro["total"]
+        self.arquivos.append(registro)
+
+    def registrar(self, etapa: str, segundos: float):
+        """Soma um intervalo a uma etapa do lote."""
+        self.totais[etapa] = self.totais.get(etapa, 0.0) + segundos
+
+    def registrar_falha(self, categoria: str):
+        """Conta um PDF enviado para a quarentena (categoria da coluna "Falha")."""
+        self.falhas[categoria] = self.falhas.get(categoria, 0) + 1
+
+    def registrar_memoria(self, memoria: dict):
+        """Guarda o resumo do GovernadorMemoria (pico de RSS, coletas) junto com o lote."""
+        self.memoria = dict(memoria)
+
+    @contextmanager
+    def cronometrar(self, etapa: str):
+        """Mede o bloco `with` e soma o tempo à etapa."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio)
+
+    def finalizar(self):
+        """Marca o fim do lote e grava o resumo no log."""
+        self.fim = time.perf_counter()
+        resumo = self.resumo()
+        logger.info(
+            "Lote concluído: %d arquivo(s) em %.2fs (%.1f arquivo(s)/s, %d do cache); etapas (s): %s",
+            resumo["arquivos"], resumo["duracao"], resumo["arquivos_por_segundo"], resumo["acertos_cache"],
+            ", ".join(f"{etapa}={segundos:.3f}" for etapa, segundos in resumo["etapas"].items()),
+        )
+        if self.memoria:
+            logger.info(
+                "Memória: pico de %.0f MB (%.0f MB de PDFs em voo), %d coleta(s), %d espera(s)",
+                self.memoria["pico_rss_mb"], self.memoria["pico_em_voo_mb"], self.memoria["coletas"], self.memoria["esperas"],
+            )
+        if self.arquivos_ocr:
+            logger.info("OCR: %d arquivo(s) digitalizado(s) em %.2fs", self.arquivos_ocr, self.segundos_ocr)
+        if self.falhas:
+            logger.info(
+                "Quarentena: %s",
+                ", ".join(f"{categoria}={quantidade}" for categoria, quantidade in sorted(self.falhas.items())),
+            )
+        for registro in self.mais_lentos(5):
+            logger.info("Arquivo lento: %s (%.3fs)", registro["arquivo"], registro["total"])
+
+    def resumo(self) -> dict:
+        """Totais do lote: duração, vazão e segundos somados por etapa."""
+        duracao = (self.fim or time.perf_counter()) - self.inicio
+        return {
+            "arquivos": len(self.arquivos),
+            "acertos_cache": self.acertos_cache,
+            "duracao": duracao,
+            "arquivos_por_segundo": len(self.arquivos) / duracao if duracao else 0.0,
+            "etapas": dict(self.totais),
+            "ocr": {"arquivos": self.arquivos_ocr, "segundos": self.segundos_ocr},
+            "memoria": dict(self.memoria),
+            "falhas": dict(self.falhas),
+        }
+
+    def mais_lentos(self, n: int = 10) -> list:
+        """Os n arquivos com maior tempo total de extração."""
+        return heapq.nlargest(n, self.arquivos, key=lambda registro: registro["total"])
+
+    def exportar_jsonl(self) -> str:
+        """Uma linha JSON por arquivo seguida de uma linha com o resumo do lote."""
+        linhas = [json.dumps({"tipo": "arquivo", **registro}, ensure_ascii=False) for registro in self.arquivos]
+        linhas.append(json.dumps({"tipo": "lote", **self.resumo()}, ensure_ascii=False))
+        return "\n".join(linhas) + "\n"
+
+    def exportar_prometheus(self) -> str:
+        """Resumo do lote no formato de texto do Prometheus."""
+        resumo = self.resumo()
+        linhas = [
+            "# HELP detran_extracao_arquivos_total Arquivos processados no lote.",
+            "# TYPE detran_extracao_arquivos_total counter",
+            f"detran_extracao_arquivos_total {resumo['arquivos']}",
+            "# HELP detran_extracao_cache_acertos_total Arquivos lidos do cache de resultados.",
+            "# TYPE detran_extracao_cache_acertos_total counter",
+            f"detran_extracao_cache_acertos_total {resumo['acertos_cache']}",
+            "# HELP detran_extracao_duracao_segundos Duração total do lote.",
+            "# TYPE detran_extracao_duracao_segundos gauge",
+            f"detran_extracao_duracao_segundos {resumo['duracao']:.6f}",
+            "# HELP detran_extracao_etapa_segundos_total Tempo somado em cada etapa.",
+            "# TYPE detran_extracao_etapa_segundos_total counter",
+        ]
+        linhas += [
+            f'detran_extracao_etapa_segundos_total{{etapa="{etapa}"}} {segundos:.6f}'
+            for etapa, segundos in resumo["etapas"].items()
+        ]
+        if resumo["ocr"]["arquivos"]:
+            linhas += [
+                "# HELP detran_extracao_ocr_arquivos_total Arquivos sem camada de texto extraídos com OCR.",
+                "# TYPE detran_extracao_ocr_arquivos_total counter",
+                f"detran_extracao_ocr_arquivos_total {resumo['ocr']['arquivos']}",
+                "# HELP detran_extracao_ocr_segundos_total Tempo somado das extrações com OCR.",
+                "# TYPE detran_extracao_ocr_segundos_total counter",
+                f"detran_extracao_ocr_segundos_total {resumo['ocr']['segundos']:.6f}",
+            ]
+        if resumo["falhas"]:
+            linhas += [
+                "# HELP detran_extracao_falhas_total PDFs enviados para a quarentena, por categoria.",
+                "# TYPE detran_extracao_falhas_total counter",
+            ]
+            linhas += [
+                f'detran_extracao_falhas_total{{categoria="{categoria}"}} {quantidade}'
+                for categoria, quantidade in resumo["falhas"].items()
+            ]
+        if resumo["memoria"]:
+            linhas += [
+                "# HELP detran_extracao_pico_rss_bytes Pico de memória residente do processo principal no lote.",
+                "# TYPE detran_extracao_pico_rss_bytes gauge",
+                f"detran_extracao_pico_rss_bytes {resumo['memoria']['pico_rss_mb'] * 1024 * 1024:.0f}",
+                "# HELP detran_extracao_coletas_gc_total Coletas de lixo disparadas pelo orçamento de memória.",
+                "# TYPE detran_extracao_coletas_gc_total counter",
+                f"detran_extracao_coletas_gc_total {resumo['memoria']['coletas']}",
+            ]
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho: str):
+        """Grava as métricas em JSON lines (.jsonl) ou formato Prometheus (.prom/.txt)."""
+        conteudo = self.exportar_jsonl() if caminho.endswith((".jsonl", ".json")) else self.exportar_prometheus()
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(conteudo)
@@ -0,0 +1,67 @@
+import functools
+import logging
+import time
+
+from extrator import extrair_pdf
+
+logger = logging.getLogger(__name__)
+
+# --- OCR de Relatórios Digitalizados ---
+
+# Idioma e resolução passados ao Tesseract (via PyMuPDF)
+IDIOMA_OCR = "por"
+DPI_OCR = 300
+
+# O OCR é bem mais lento que a camada de texto: a pista de OCR usa este múltiplo do tempo limite
+FATOR_TEMPO_OCR = 5
+
+
+@functools.cache
+def ocr_disponivel() -> bool:
+    """True se o PyMuPDF encontra o Tesseract (os dados de idioma, via TESSDATA_PREFIX ou a instalação)."""
+    import pymupdf
+
+    try:
+        pymupdf.get_tessdata()
+    except RuntimeError as e:
+        logger.warning("OCR indisponível: %s", e)
+        return False
+    return True
+
+
+def ler_texto_ocr(pagina) -> str:
+    """
+    Texto da página, passando pelo OCR as partes que não têm camada de texto.
+
+    Uma página sem texto é reconhecida inteira. Numa página com texto e imagens (ex.: o
+    cabeçalho e o rodapé que o navegador grava em cima de uma digitalização), só as
+    imagens passam pelo OCR e o texto existente é mantido; páginas só com texto não
+    passam pelo OCR.
+    """
+    texto = pagina.get_text()
+    tem_texto = bool(texto.strip())
+    if tem_texto and not pagina.get_images():
+        return texto
+    textpage = pagina.get_textpage_ocr(language=IDIOMA_OCR, dpi=DPI_OCR, full=not tem_texto)
+    return pagina.get_text(textpage=textpage)
+
+
+def extrair_pdf_ocr(conteudo: bytes, filename: str, tempos: dict | None = None) -> dict:
+    """
+    Extrai um PDF digitalizado com OCR, com o mesmo modelo e campos de extrair_pdf.
+
+    Roda nos processos da pista de OCR, por isso é uma função de módulo. A linha
+    retornada inclui "Tempo OCR (s)" com a duração da extração.
+
+    Args:
+        conteudo: Bytes do PDF.
+        filename: O nome original do arquivo para incluir no resultado.
+        tempos: Dicionário opcional que recebe os segundos gastos em cada etapa (o OCR entra em "get_text").
+
+    Returns:
+        O dicionário de extrair_pdf.
+    """
+    inicio = time.perf_counter()
+    dados = extrair_pdf(conteudo, filename, tempos=tempos, ler_pagina=ler_texto_ocr)
+    dados["Tempo OCR (s)"] = round(time.perf_counter() - inicio, 3)
+    return dados
@@ -0,0 +1,576 @@
+import hashlib
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import NamedTuple
+
+from extrator import (FALHA_PROCESSO, FALHA_SEM_TEXTO, FALHA_TEMPO, aquecer, em_quarentena, extrair_pdf, falha,
+                      verificar_tamanho)
+from metricas import medir
+
+# --- Motores de Processamento ---
+
+
+def ler_bytes(file_content) -> bytes:
+    """
+    Converte o conteúdo recebido do upload em bytes crus.
+
+    Os processos do pool só recebem objetos serializáveis, então o BytesIO
+    (ou o UploadedFile do Streamlit, que se comporta como BytesIO) é lido aqui.
+
+    Args:
+        file_content: bytes, BytesIO ou UploadedFile com o PDF.
+
+    Returns:
+        O conteúdo do PDF em bytes.
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        return bytes(file_content)
+    if isinstance(file_content, BytesIO):
+        return file_content.getvalue()
+    return file_content.read()
+
+
+def consultar_cache(conteudo: bytes, filename: str, cache=None, indice=None) -> tuple:
+    """
+    Procura o PDF no cache pelo SHA-256 do conteúdo.
+
+    Um resultado guardado antes de o PDF ser indexado (ex.: com o índice desativado) é
+    indexado aqui. O mesmo PDF pode chegar com outro nome: a linha volta com `filename`.
+
+    Returns:
+        Tupla (sha256, dados). sha256 é None sem cache nem índice; dados é None quando
+        o PDF ainda precisa ser extraído.
+    """
+    if cache is None and indice is None:
+        return None, None
+    sha256 = hashlib.sha256(conteudo).hexdigest()
+    dados = cache.obter(cache.chave_do_hash(sha256)) if cache is not None else None
+    if dados is not None:
+        if indice is not None and not indice.contem(sha256):
+            indice.registrar(sha256, dados)
+        dados["Nome do Arquivo"] = filename
+    return sha256, dados
+
+
+def guardar_resultado(sha256: str | None, dados: dict, cache=None, indice=None):
+    """Grava a linha extraída no cache e no índice (as falhas não são guardadas: podem ser transitórias)."""
+    if sha256 is None or "Erro" in dados:
+        return
+    if cache is not None:
+        cache.gravar(cache.chave_do_hash(sha256), dados)
+    if indice is not None:
+        indice.registrar(sha256, dados)
+
+
+def precisa_ocr(dados: dict) -> bool:
+    """True se nenhum campo saiu da camada de texto do PDF (ex.: digitalizado): vale tentar com OCR."""
+    return dados.get("Falha") == FALHA_SEM_TEXTO
+
+
+class _Motor:
+    """
+    Base dos motores: lê a entrada, consulta o cache antes de extrair e grava os
+    resultados novos. PDFs acima do tamanho máximo são recusados sem sair do processo
+    principal. Com `metricas`, registra os tempos e as falhas de cada etapa; com
+    `governador`, informa os bytes em voo e respeita o orçamento de memória; com
+    `indice`, as linhas extraídas (ou lidas do cache) são indexadas por veículo. Com
+    `extrator_ocr`, os PDFs sem camada de texto são extraídos de novo com OCR.
+    """
+
+    def __init__(self, extrator=extrair_pdf, cache=None, metricas=None, governador=None, indice=None,
+                 extrator_ocr=None):
+        self.extrator = extrator
+        self.extrator_ocr = extrator_ocr
+        self.cache = cache
+        self.metricas = metricas
+        self.governador = governador
+        self.indice = indice
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _ler_entrada(self, arquivos):
+        """
+        Gera (indice, bytes, filename), medindo o tempo de leitura/descompactação de cada PDF.
+
+        Os membros de ZIP que não puderam ser lidos chegam como a linha de falha (ver
+        entrada._iterar_zip) e seguem no lugar dos bytes.
+        """
+        iterador = iter(arquivos)
+        indice = 0
+        while True:
+            inicio = time.perf_counter()
+            try:
+                file_content, filename = next(iterador)
+            except StopIteration:
+                return
+            conteudo = file_content if isinstance(file_content, dict) else ler_bytes(file_content)
+            if self.metricas is not None:
+                self.metricas.registrar("leitura", time.perf_counter() - inicio)
+            yield indice, conteudo, filename
+            indice += 1
+
+    def _consultar_cache(self, conteudo: bytes, filename: str):
+        """
+        Procura o PDF no cache pelo SHA-256 do conteúdo.
+
+        Returns:
+            Tupla (sha256, dados); dados é None quando o PDF ainda precisa ser extraído.
+        """
+        inicio = time.perf_counter()
+        sha256, dados = consultar_cache(conteudo, filename, self.cache, self.indice)
+        if self.metricas is not None and sha256 is not None:
+            self.metricas.registrar("cache", time.perf_counter() - inicio)
+            if dados is not None:
+                self.metricas.registrar_arquivo(filename, {}, len(conteudo), cache=True)
+        return sha256, dados
+
+    def _quarentena(self, dados: dict) -> dict:
+        """Conta a falha nas métricas (se houver) e retorna a linha."""
+        if self.metricas is not None and em_quarentena(dados):
+            self.metricas.registrar_falha(dados["Falha"])
+        return dados
+
+    def _tarefa(self, conteudo: bytes, filename: str, ocr: bool = False) -> tuple:
+        """Função e argumentos a executar para extrair um PDF (com ou sem medição, com ou sem OCR)."""
+        extrator = self.extrator_ocr if ocr else self.extrator
+        if self.metricas is None:
+            return extrator, conteudo, filename
+        return medir, extrator, conteudo, filename
+
+    def _precisa_ocr(self, resultado) -> bool:
+        """True se nenhum campo saiu da camada de texto do PDF (ex.: digitalizado) e o OCR está ativo."""
+        if self.extrator_ocr is None:
+            return False
+        return precisa_ocr(resultado if self.metricas is None else resultado[0])
+
+    def _concluir(self, resultado, sha256: str | None, filename: str, tamanho: int) -> dict:
+        """Registra os tempos (se medidos), grava no cache e no índice e retorna os dados extraídos."""
+        if self.metricas is None:
+            dados = resultado
+        else:
+            dados, tempos = resultado
+            self.metricas.registrar_arquivo(filename, tempos, tamanho, ocr="Tempo OCR (s)" in dados)
+        guardar_resultado(sha256, dados, self.cache, self.indice)
+        return self._quarentena(dados)
+
+
+class MotorSequencial(_Motor):
+    """
+    Processa os arquivos um a um no próprio processo (útil para depuração).
+
+    Sem processos separados não há como interromper um PDF travado nem sobreviver a
+    uma falha do PyMuPDF: para isso, use o MotorParalelo (mesmo com um processo só).
+    """
+
+    def processar(self, arquivos):
+        """
+        Extrai os dados de cada arquivo, na ordem de entrada.
+
+        Args:
+            arquivos: Iterável de tuplas (file_content, filename).
+
+        Yields:
+            Tuplas (indice, dados) onde indice é a posição do arquivo na entrada.
+        """
+        for i, conteudo, filename in self._ler_entrada(arquivos):
+            if isinstance(conteudo, dict):
+                yield i, self._quarentena(conteudo)
+                continue
+            sha256, dados = self._consultar_cache(conteudo, filename)
+            if dados is None:
+                dados = verificar_tamanho(len(conteudo), filename)
+                if dados is not None:
+                    yield i, self._quarentena(dados)
+                    continue
+                if self.governador is not None:
+                    self.governador.reservar(len(conteudo))
+                funcao, *argumentos = self._tarefa(conteudo, filename)
+                resultado = funcao(*argumentos)
+                if self._precisa_ocr(resultado):
+                    funcao, *argumentos = self._tarefa(conteudo, filename, ocr=True)
+                    resultado = funcao(*argumentos)
+                dados = self._concluir(resultado, sha256, filename, len(conteudo))
+                if self.governador is not None:
+                    self.governador.liberar(len(conteudo))
+                    self.governador.amostrar()
+            yield i, dados
+
+
+# Posição deste processo em _marcas; preenchidos por _iniciar_processo nos processos do pool
+_marcas = None
+_posicao = None
+
+
+def _iniciar_processo(marcas, proximo):
+    """
+    Initializer dos processos do pool: reserva a posição do processo em `marcas` e importa o PyMuPDF.
+
+    Args:
+        marcas: Array compartilhado com dois valores por processo: o número da tarefa em
+            execução e o instante (time.monotonic) em que ela começou.
+        proximo: Value compartilhado com a próxima posição livre.
+    """
+    global _marcas, _posicao
+    with proximo.get_lock():
+        _posicao = proximo.value
+        proximo.value += 1
+    _marcas = marcas
+    aquecer()
+
+
+def _executar(numero: int, funcao, *argumentos):
+    """Roda uma tarefa no processo do pool, marcando em _marcas quando ela começou de fato."""
+    # O instante é gravado antes do número: quem lê o número da tarefa já encontra o início dela
+    _marcas[2 * _posicao + 1] = time.monotonic()
+    _marcas[2 * _posicao] = numero
+    try:
+        return funcao(*argumentos)
+    finally:
+        _marcas[2 * _posicao] = -1
+
+
+class _Pendente(NamedTuple):
+    """PDF enviado a uma pista e ainda sem resultado."""
+    indice: int
+    conteudo: bytes
+    filename: str
+    sha256: str | None
+    # Quantas vezes o PDF estava em um processo que morreu
+    quedas: int = 0
+
+
+class Pista:
+    """
+    Um ProcessPoolExecutor com os PDFs em andamento e o próprio tempo limite.
+
+    O pool só é criado no primeiro envio, então uma pista que não recebe nada (ex.: a
+    de OCR em um lote sem digitalizações) não inicia processos.
+
+    O relógio do tempo limite de cada PDF começa quando um processo começa a extraí-lo,
+    informado pelo próprio processo (ver _executar): o ProcessPoolExecutor marca como
+    "running" as tarefas que só estão na fila interna dele, esperando um processo livre.
+    """
+
+    def __init__(self, max_workers: int, tempo_limite: float | None = None, ocr: bool = False):
+        self.max_workers = max_workers
+        self.tempo_limite = tempo_limite or None
+        self.ocr = ocr
+        self.executor = None
+        self.pendentes = {}
+        self.numeros = {}
+        self.reinicios = 0
+        self._marcas = None
+        self._contador = itertools.count()
+
+    def _criar_executor(self) -> ProcessPoolExecutor:
+        # "spawn" evita herdar as threads do servidor do Streamlit via fork;
+        # os processos importam apenas o módulo do extrator. O PyMuPDF é importado
+        # ao iniciar cada processo, fora do tempo limite do primeiro PDF.
+        contexto = multiprocessing.get_context("spawn")
+        self._marcas = contexto.Array("d", [-1.0] * (2 * self.max_workers))
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=contexto,
+            initializer=_iniciar_processo,
+            initargs=(self._marcas, contexto.Value("i", 0)),
+        )
+
+    def enviar(self, tarefa: tuple, pendente):
+        """Envia a tarefa (função e argumentos) ao pool e retorna o futuro; `pendente` fica em pendentes."""
+        if self.executor is None:
+            self.executor = self._criar_executor()
+        numero = next(self._contador)
+        futuro = self.executor.submit(_executar, numero, *tarefa)
+        self.pendentes[futuro] = pendente
+        self.numeros[futuro] = numero
+        return futuro
+
+    def concluir(self, futuro):
+        """Remove o futuro dos pendentes e retorna o que foi guardado com ele (o _Pendente, no motor)."""
+        self.numeros.pop(futuro, None)
+        return self.pendentes.pop(futuro)
+
+    def estourados(self) -> list:
+        """Futuros cujo processo está extraindo o PDF há mais de tempo_limite segundos."""
+        if not self.numeros:
+            return []
+        marcas = self._marcas[:]
+        # Número da tarefa -> início, só das tarefas que algum processo está executando
+        inicios = {int(marcas[i]): marcas[i + 1] for i in range(0, len(marcas), 2) if marcas[i] >= 0}
+        agora = time.monotonic()
+        return [
+            futuro for futuro, numero in self.numeros.items()
+            if numero in inicios and agora - inicios[numero] > self.tempo_limite
+        ]
+
+    def reiniciar(self) -> dict:
+        """Encerra os processos, cria um pool novo e retorna os pendentes {futuro: pendente} do antigo."""
+        antigos, self.pendentes = self.pendentes, {}
+        self.numeros.clear()
+        self._matar()
+        self.executor = self._criar_executor()
+        self.reinicios += 1
+        return antigos
+
+    def _matar(self):
+        """Encerra o pool sem esperar pelos PDFs em andamento."""
+        # O ProcessPoolExecutor não expõe os processos; sem o kill, shutdown esperaria o PDF travado
+        for processo in list((self.executor._processes or {}).values()):
+            processo.kill()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def encerrar(self):
+        """Encerra o pool; PDFs ainda em andamento (ex.: quem consome parou no meio do lote) são interrompidos."""
+        if self.executor is not None:
+            if self.pendentes:
+                self._matar()
+            else:
+                self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        self.pendentes.clear()
+        self.numeros.clear()
+
+
+class MotorParalelo(_Motor):
+    """
+    Distribui os arquivos entre vários processos com um ProcessPoolExecutor.
+
+    A extração de texto do PyMuPDF é limitada por CPU, então cada PDF é enviado
+    como bytes crus para um processo separado. Os resultados são devolvidos à
+    medida que terminam, junto com o índice original, para que quem chama possa
+    manter a ordem das linhas estável. PDFs encontrados no cache ou no índice não são enviados
+    aos processos.
+
+    Cada PDF fica isolado do restante do lote: um PDF que passa de `tempo_limite`
+    segundos vira uma falha "tempo_esgotado" e os processos são reiniciados; se um
+    processo morre (ex.: falha do PyMuPDF), os PDFs que estavam no pool são
+    reenviados um de cada vez, e o que derrubar o processo de novo vira uma falha
+    "processo_encerrado". Os demais PDFs seguem normalmente.
+
+    Com `extrator_ocr`, os PDFs sem camada de texto vão para uma pista separada, com
+    `processos_ocr` processos, tempo limite próprio e uma fila de no máximo
+    `max_fila_ocr` PDFs: o OCR, bem mais lento, não ocupa os processos da extração
+    normal, que continua lendo a entrada enquanto a fila de OCR tiver espaço.
+    """
+
+    def __init__(self, max_workers: int | None = None, extrator=extrair_pdf, cache=None, metricas=None,
+                 governador=None, indice=None, max_pendentes: int | None = None, tempo_limite: float | None = None,
+                 extrator_ocr=None, processos_ocr: int = 1, tempo_limite_ocr: float | None = None,
+                 max_fila_ocr: int = 32):
+        super().__init__(extrator, cache, metricas, governador, indice, extrator_ocr)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Limita quantos PDFs ficam em memória aguardando um processo livre
+        self.max_pendentes = max_pendentes or self.max_workers * 2
+        self.max_fila_ocr = max_fila_ocr
+        self._rapida = Pista(self.max_workers, tempo_limite)
+        self._ocr = Pista(processos_ocr, tempo_limite_ocr, ocr=True)
+        self._fila_ocr = deque()
+        self._suspeitos = deque()
+
+    @property
+    def reinicios(self) -> int:
+        """Quantas vezes algum pool foi recriado (tempo esgotado ou processo encerrado)."""
+        return self._rapida.reinicios + self._ocr.reinicios
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._rapida.encerrar()
+        self._ocr.encerrar()
+        return False
+
+    def processar(self, arquivos):
+        """
+        Extrai os dados dos arquivos em paralelo.
+
+        Args:
+            arquivos: Iterável de tuplas (file_content, filename).
+
+        Yields:
+            Tuplas (indice, dados) na ordem em que os processos terminam.
+        """
+        self._fila_ocr.clear()
+        self._suspeitos.clear()
+
+        for i, conteudo, filename in self._ler_entrada(arquivos):
+            if isinstance(conteudo, dict):
+                yield i, self._quarentena(conteudo)
+                continue
+            sha256, dados = self._consultar_cache(conteudo, filename)
+            if dados is None:
+                dados = verificar_tamanho(len(conteudo), filename)
+            if dados is not None:
+                yield i, self._quarentena(dados)
+                continue
+
+            if self.governador is not None:
+                self.governador.reservar(len(conteudo))
+            self._enviar(self._rapida, _Pendente(i, conteudo, filename, sha256))
+
+            # Acima do orçamento de memória, a janela encolhe para um PDF por processo:
+            # os processos continuam ocupados, mas nada mais é lido do ZIP até liberar.
+            while (len(self._rapida.pendentes) + len(self._suspeitos) >= self._limite_pendentes()
+                   or len(self._fila_ocr) >= self.max_fila_ocr):
+                yield from self._esperar()
+
+        while self._rapida.pendentes or self._ocr.pendentes or self._fila_ocr or self._suspeitos:
+            yield from self._esperar()
+
+    def _limite_pendentes(self) -> int:
+        if self.governador is not None and self.governador.aguardar():
+            return self.max_workers
+        return self.max_pendentes
+
+    def _enviar(self, pista: Pista, pendente: _Pendente):
+        pista.enviar(self._tarefa(pendente.conteudo, pendente.filename, ocr=pista.ocr), pendente)
+
+    def _esperar(self):
+        """Espera algum PDF terminar (ou estourar o tempo limite) e gera os pares (indice, dados) prontos."""
+        pistas = (self._rapida, self._ocr)
+        # Depois de uma queda do pool, os PDFs suspeitos voltam um de cada vez
+        if self._suspeitos and not any(pendente.quedas for pista in pistas for pendente in pista.pendentes.values()):
+            self._enviar(*self._suspeitos.popleft())
+        # A pista de OCR recebe só o que os processos dela já podem começar
+        while self._fila_ocr and len(self._ocr.pendentes) < self._ocr.max_workers:
+            self._enviar(self._ocr, self._fila_ocr.popleft())
+        futuros = [futuro for pista in pistas for futuro in pista.pendentes]
+        if not futuros:
+            return
+
+        espera = 1.0 if any(pista.tempo_limite for pista in pistas) else None
+        concluidos, _ = wait(futuros, timeout=espera, return_when=FIRST_COMPLETED)
+        for pista in pistas:
+            caiu = False
+            for futuro in concluidos.intersection(pista.pendentes):
+                if isinstance(futuro.exception(), BrokenProcessPool):
+                    caiu = True
+                    continue
+                yield from self._resultado(pista, futuro, pista.concluir(futuro))
+            if caiu:
+                yield from self._recuperar_queda(pista)
+            elif pista.tempo_limite is not None:
+                yield from self._verificar_tempo(pista)
+
+    def _verificar_tempo(self, pista: Pista):
+        estourados = pista.estourados()
+        if not estourados:
+            return
+        for futuro in estourados:
+            pendente = pista.concluir(futuro)
+            self._liberar(pendente)
+            yield pendente.indice, self._quarentena(
+                falha(pendente.filename, FALHA_TEMPO, f"Extração interrompida após {pista.tempo_limite:g}s"))
+        # Um processo travado não atende a cancelamentos: o pool é recriado e os outros PDFs reenviados
+        yield from self._reiniciar(pista, quedas=False)
+
+    def _recuperar_queda(self, pista: Pista):
+        """Recria o pool depois que um processo morreu e separa os PDFs afetados como suspeitos."""
+        for pendente in (yield from self._reiniciar(pista, quedas=True)):
+            if pendente.quedas > 1:
+                self._liberar(pendente)
+                yield pendente.indice, self._quarentena(
+                    falha(pendente.filename, FALHA_PROCESSO, "O processo de extração foi encerrado ao ler este PDF"))
+            else:
+                self._suspeitos.append((pista, pendente))
+
+    def _reiniciar(self, pista: Pista, quedas: bool):
+        """
+        Recria o pool da pista e reenvia os PDFs sem resultado.
+
+        Com `quedas`, os PDFs afetados não são reenviados: são retornados com o contador
+        de quedas incrementado, para que _recuperar_queda decida o que fazer com eles.
+        """
+        afetados = []
+        for futuro, pendente in pista.reiniciar().items():
+            if futuro.done() and not futuro.cancelled() and futuro.exception() is None:
+                # Terminou antes de os processos serem encerrados
+                yield from self._resultado(pista, futuro, pendente)
+            elif quedas:
+                afetados.append(pendente._replace(quedas=pendente.quedas + 1))
+            else:
+                self._enviar(pista, pendente)
+        return afetados
+
+    def _liberar(self, pendente: _Pendente):
+        if self.governador is not None:
+            self.governador.liberar(len(pendente.conteudo))
+
+    def _resultado(self, pista: Pista, futuro, pendente: _Pendente):
+        try:
+            resultado = futuro.result()
+        except Exception as e:
+            self._liberar(pendente)
+            yield pendente.indice, self._quarentena(falha(pendente.filename, FALHA_PROCESSO, f"Falha na extração: {e}"))
+            return
+        if not pista.ocr and self._precisa_ocr(resultado):
+            # Os bytes continuam reservados no governador até o OCR terminar
+            self._fila_ocr.append(pendente._replace(quedas=0))
+            return
+        self._liberar(pendente)
+        yield pendente.indice, self._concluir(resultado, pendente.sha256, pendente.filename, len(pendente.conteudo))
+
+
+def em_ordem(resultados):
+    """
+    Reordena os pares (indice, dados) que chegam fora de ordem.
+
+    Guarda apenas os resultados que chegaram antes dos anteriores, então pode ser
+    usado para gravar a saída aos poucos mantendo a ordem das linhas.
+
+    Args:
+        resultados: Iterável de tuplas (indice, dados), como o gerado por processar.
+
+    Yields:
+        Os dicionários na ordem dos índices.
+    """
+    aguardando = {}
+    proximo = 0
+    for indice, dados in resultados:
+        aguardando[indice] = dados
+        while proximo in aguardando:
+            yield aguardando.pop(proximo)
+            proximo += 1
+
+
+def criar_motor(max_workers: int | None = None, extrator=extrair_pdf, cache=None, metricas=None, governador=None,
+                indice=None, tempo_limite: float | None = None, ocr: bool = False, processos_ocr: int = 1):
+    """
+    Escolhe o motor de processamento conforme o número de processos.
+
+    Args:
+        max_workers: Número de processos. 1 usa o motor sequencial; None usa todos os núcleos.
+        extrator: Função de extração (precisa ser importável para rodar no pool).
+        cache: CacheResultados opcional, consultado antes de extrair cada PDF.
+        metricas: Metricas opcional que recebe os tempos de cada arquivo e etapa.
+        governador: GovernadorMemoria opcional que limita os PDFs em voo ao orçamento de memória.
+        indice: IndiceVeiculos opcional; PDFs já indexados não são extraídos de novo.
+        tempo_limite: Segundos máximos por PDF (None/0 = sem limite). Exige processos
+            separados, então com limite o motor é sempre o paralelo.
+        ocr: Se os PDFs sem camada de texto passam pelo OCR (exige o Tesseract; sem ele, continuam
+            como falha "sem_texto").
+        processos_ocr: Processos da pista de OCR do motor paralelo.
+
+    Returns:
+        Um motor com o método processar(arquivos).
+    """
+    extrator_ocr = None
+    if ocr:
+        from ocr import FATOR_TEMPO_OCR, extrair_pdf_ocr, ocr_disponivel
+        if ocr_disponivel():
+            extrator_ocr = extrair_pdf_ocr
+    if max_workers == 1 and not tempo_limite:
+        return MotorSequencial(extrator, cache, metricas, governador, indice, extrator_ocr)
+    return MotorParalelo(max_workers, extrator, cache, metricas, governador, indice, tempo_limite=tempo_limite,
+                         extrator_ocr=extrator_ocr, processos_ocr=processos_ocr,
+                         tempo_limite_ocr=tempo_limite * FATOR_TEMPO_OCR if extrator_ocr and tempo_limite else None)
@@ -0,0 +1,250 @@
+import re
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+# --- Registros Tipados ---
+
+# Colunas convertidas para número (R$ no formato brasileiro: "R$ 1.234,56")
+COLUNAS_MOEDA = (
+    'Total IPVA',
+    'Total Multas (Pix)',
+    'Total de débitos fora do sistema estadual de multa',
+    'Licenciamento - Total de débitos',
+)
+COLUNAS_ANO = ('Ano fabricação', 'Ano modelo', 'Ano Vencimento Licenciamento')
+COLUNAS_RESTRICAO = (
+    'Bloqueio de Furto/Roubo',
+    'Restrição Financeira',
+    'Restrição Administrativa',
+    'Restrição Judicial',
+    'Restrição por Veículo Guinchado',
+)
+# Textos com poucos valores distintos, guardados como category
+COLUNAS_CATEGORIA = ('Marca / Modelo', 'Cor', 'Tipo', 'Combustível', 'Modelo') + COLUNAS_RESTRICAO
+
+# Valor das restrições quando o veículo não tem nenhuma
+SEM_RESTRICAO = 'nada consta'
+
+# Tudo que sai de "R$ 1.234,56" antes de trocar a vírgula decimal por ponto
+_PADRAO_SEPARADORES = re.compile(r"R\$|\s|\.")
+
+
+def converter_moeda(valor: str | None) -> float | None:
+    """
+    Converte um valor como "R$ 1.234,56" em 1234.56.
+
+    Returns:
+        O valor em reais, ou None se o texto não for um valor monetário.
+    """
+    if not valor:
+        return None
+    numero = _PADRAO_SEPARADORES.sub("", valor).replace(",", ".")
+    try:
+        return float(numero)
+    except ValueError:
+        return None
+
+
+def converter_moedas(serie: pd.Series) -> pd.Series:
+    """Versão vetorizada de converter_moeda para uma coluna inteira (Float64, com <NA> onde não há valor)."""
+    numeros = serie.astype("string").str.replace(_PADRAO_SEPARADORES, "", regex=True).str.replace(",", ".", regex=False)
+    return pd.to_numeric(numeros, errors="coerce").astype("Float64")
+
+
+def formatar_moeda(valor: float) -> str:
+    """Formata 1234.56 como "R$ 1.234,56"."""
+    return "R$ " + f"{valor:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def converter_anos(serie: pd.Series) -> pd.Series:
+    """Converte uma coluna de anos ("2024") em Int16, com <NA> onde não há valor."""
+    return pd.to_numeric(serie, errors="coerce").astype("Int16")
+
+
+def _converter_ano(valor: str | None) -> int | None:
+    return int(valor) if valor and valor.isdigit() else None
+
+
+@dataclass(slots=True)
+class Relatorio:
+    """
+    Um relatório extraído, com os valores já convertidos.
+
+    Ocupa bem menos memória que o dicionário de strings retornado por extrair_pdf
+    (sem __dict__ por instância) e pode ser somado/filtrado diretamente. É o que
+    IndiceVeiculos.consultar retorna; para lotes, prefira tabela(), que faz as mesmas
+    conversões de forma vetorizada.
+    """
+    nome_arquivo: str
+    data_emissao: str | None = None
+    marca_modelo: str | None = None
+    cor: str | None = None
+    renavam: str | None = None
+    ano_fabricacao: int | None = None
+    chassi: str | None = None
+    ano_modelo: int | None = None
+    tipo: str | None = None
+    combustivel: str | None = None
+    total_ipva: float | None = None
+    total_multas_pix: float | None = None
+    total_fora_sistema_estadual: float | None = None
+    ano_vencimento_licenciamento: int | None = None
+    total_licenciamento: float | None = None
+    bloqueio_furto_roubo: str | None = None
+    restricao_financeira: str | None = None
+    restricao_administrativa: str | None = None
+    restricao_judicial: str | None = None
+    restricao_veiculo_guinchado: str | None = None
+    paginas_ignoradas: int = 0
+    modelo: str | None = None
+    tempo_ocr: float | None = None
+    erro: str | None = None
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "Relatorio":
+        """Cria o registro a partir do dicionário retornado por extrair_pdf."""
+        valores = {}
+        for campo, coluna in _COLUNAS.items():
+            valor = dados.get(coluna)
+            if coluna in COLUNAS_MOEDA:
+                valor = converter_moeda(valor)
+            elif coluna in COLUNAS_ANO:
+                valor = _converter_ano(valor)
+            if valor is not None:
+                valores[campo] = valor
+        return cls(**valores)
+
+    def para_dict(self) -> dict:
+        """Dicionário com os nomes de coluna do extrator (valores ausentes ficam de fora)."""
+        return {
+            coluna: getattr(self, campo)
+            for campo, coluna in _COLUNAS.items()
+            if getattr(self, campo) is not None
+        }
+
+    @property
+    def tem_restricao(self) -> bool:
+        """True se alguma restrição ou bloqueio diferente de "Nada consta" foi encontrado."""
+        return any(
+            valor and not valor.lower().startswith(SEM_RESTRICAO)
+            for valor in (getattr(self, campo) for campo in _CAMPOS_RESTRICAO)
+        )
+
+
+# Atributo do Relatorio -> coluna do extrator, na ordem dos campos
+_COLUNAS = dict(zip(
+    (campo.name for campo in fields(Relatorio)),
+    ('Nome do Arquivo', 'Data de Emissão', 'Marca / Modelo', 'Cor', 'Renavam', 'Ano fabricação', 'Chassi', 'Ano modelo', 'Tipo',
+     'Combustível', 'Total IPVA', 'Total Multas (Pix)', 'Total de débitos fora do sistema estadual de multa',
+     'Ano Vencimento Licenciamento', 'Licenciamento - Total de débitos', 'Bloqueio de Furto/Roubo',
+     'Restrição Financeira', 'Restrição Administrativa', 'Restrição Judicial', 'Restrição por Veículo Guinchado',
+     'Páginas Ignoradas', 'Modelo', 'Tempo OCR (s)', 'Erro'),
+    strict=True,
+))
+_CAMPOS_RESTRICAO = [campo for campo, coluna in _COLUNAS.items() if coluna in COLUNAS_RESTRICAO]
+
+
+def tabela(linhas) -> pd.DataFrame:
+    """
+    Monta o DataFrame tipado de um lote.
+
+    Os valores monetários viram Float64, os anos Int16, os textos repetitivos category
+    e os ausentes ficam como <NA>, em vez de tudo virar object por causa do
+    fillna('Não informado').
+
+    Args:
+        linhas: Dicionários retornados por extrair_pdf.
+
+    Returns:
+        O DataFrame com as colunas convertidas (na ordem recebida).
+    """
+    df = pd.DataFrame(linhas)
+    for coluna in df.columns:
+        if coluna in COLUNAS_MOEDA:
+            df[coluna] = converter_moedas(df[coluna])
+        elif coluna in COLUNAS_ANO:
+            df[coluna] = converter_anos(df[coluna])
+        elif coluna in COLUNAS_CATEGORIA:
+            df[coluna] = df[coluna].astype("category")
+        elif coluna == 'Páginas Ignoradas':
+            df[coluna] = df[coluna].astype("Int16")
+        elif coluna == 'Tempo OCR (s)':
+            df[coluna] = df[coluna].astype("Float64")
+        else:
+            df[coluna] = df[coluna].astype("string")
+    return df
+
+
+def com_restricao(df: pd.DataFrame) -> pd.Series:
+    """Máscara das linhas com alguma restrição ou bloqueio diferente de "Nada consta"."""
+    mascara = pd.Series(False, index=df.index)
+    for coluna in COLUNAS_RESTRICAO:
+        if coluna in df.columns:
+            valores = df[coluna].astype("string").str.lower()
+            mascara |= (valores.notna() & ~valores.str.startswith(SEM_RESTRICAO)).fillna(False).astype(bool)
+    return mascara
+
+
+def resumir(df: pd.DataFrame) -> dict:
+    """
+    Totais de um lote calculados sobre as colunas tipadas de tabela().
+
+    Returns:
+        Dicionário com relatorios, com_erro, total_ipva, total_multas, total_licenciamento,
+        total_fora_sistema_estadual e com_restricao.
+    """
+    def soma(coluna):
+        return float(df[coluna].sum()) if coluna in df.columns else 0.0
+
+    return {
+        "relatorios": len(df),
+        "com_erro": int(df['Erro'].notna().sum()) if 'Erro' in df.columns else 0,
+        "total_ipva": soma('Total IPVA'),
+        "total_multas": soma('Total Multas (Pix)'),
+        "total_licenciamento": soma('Licenciamento - Total de débitos'),
+        "total_fora_sistema_estadual": soma('Total de débitos fora do sistema estadual de multa'),
+        "com_restricao": int(com_restricao(df).sum()),
+    }
+
+
+class FiltrosTabela:
+    """
+    Máscaras e índices de uma tabela(), calculados uma vez por lote.
+
+    Os filtros da visualização ("só com restrição", "IPVA acima de X") viram operações
+    sobre arrays do NumPy já prontos, em vez de comparar as colunas de texto ou de
+    valores a cada filtro: a restrição é uma máscara booleana e o IPVA fica ordenado,
+    então "acima de X" é uma busca binária.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.total = len(df)
+        self.com_restricao = com_restricao(df).to_numpy()
+        if 'Total IPVA' in df.columns:
+            ipva = df['Total IPVA'].to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            ipva = np.full(self.total, np.nan)
+        # NaN vai para o fim da ordenação e fica fora de qualquer busca
+        self._ordem_ipva = np.argsort(ipva, kind="stable")
+        self._ipva_ordenado = ipva[self._ordem_ipva]
+        self._ipva_validos = int(np.count_nonzero(~np.isnan(ipva)))
+
+    def posicoes(self, so_com_restricao: bool = False, ipva_minimo: float | None = None) -> np.ndarray:
+        """
+        Posições (iloc) das linhas que passam nos filtros, na ordem original.
+
+        Args:
+            so_com_restricao: Só veículos com alguma restrição ou bloqueio.
+            ipva_minimo: Só linhas com Total IPVA maior que este valor.
+        """
+        if not so_com_restricao and ipva_minimo is None:
+            return np.arange(self.total)
+        mascara = self.com_restricao.copy() if so_com_restricao else np.ones(self.total, dtype=bool)
+        if ipva_minimo is not None:
+            inicio = np.searchsorted(self._ipva_ordenado[:self._ipva_validos], ipva_minimo, side="right")
+            acima = np.zeros(self.total, dtype=bool)
+            acima[self._ordem_ipva[inicio:self._ipva_validos]] = True
+            mascara &= acima
+        return np.flatnonzero(mascara)
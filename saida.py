@@ -0,0 +1,207 @@
+import csv
+import io
+import os
+
+from extrator import colunas_saida
+
+# --- Escritores de Saída ---
+
+VALOR_AUSENTE = 'Não informado'
+
+# Colunas numéricas; as demais são gravadas como texto
+COLUNAS_INTEIRAS = {'Páginas Ignoradas'}
+COLUNAS_DECIMAIS = {'Tempo OCR (s)'}
+
+# Colunas do relatório de quarentena (PDFs que não puderam ser extraídos), gravado com o EscritorCSV
+COLUNAS_QUARENTENA = ('Nome do Arquivo', 'Falha', 'Erro')
+
+LIMITE_LINHAS_XLSX = 1_048_576  # Limite de linhas de uma planilha do Excel (inclui o cabeçalho)
+
+
+class _Escritor:
+    """Base dos escritores: grava as linhas uma a uma seguindo um esquema fixo de colunas."""
+
+    extensao = ""
+    mime = "application/octet-stream"
+
+    def __init__(self, destino, colunas=None):
+        self.destino = destino
+        self.colunas = list(colunas) if colunas is not None else colunas_saida()
+        self.linhas = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def _valores(self, dados: dict) -> list:
+        valores = []
+        for coluna in self.colunas:
+            valor = dados.get(coluna)
+            if valor is None and coluna not in COLUNAS_INTEIRAS and coluna not in COLUNAS_DECIMAIS:
+                valor = VALOR_AUSENTE
+            valores.append(valor)
+        return valores
+
+    def escrever(self, dados: dict):
+        """Grava uma linha (um dicionário retornado por extrair_pdf)."""
+        raise NotImplementedError
+
+    def fechar(self):
+        """Finaliza o arquivo de saída."""
+        raise NotImplementedError
+
+
+class EscritorCSV(_Escritor):
+    """CSV separado por ';' em UTF-8, no mesmo formato do download do app."""
+
+    extensao = ".csv"
+    mime = "text/csv"
+
+    def __init__(self, destino, colunas=None):
+        super().__init__(destino, colunas)
+        if isinstance(destino, (str, os.PathLike)):
+            self._arquivo = open(destino, "w", newline="", encoding="utf-8")
+            self._fechar_arquivo = True
+        else:
+            # Arquivo binário já aberto (ex.: arquivo temporário)
+            self._arquivo = io.TextIOWrapper(destino, encoding="utf-8", newline="", write_through=True)
+            self._fechar_arquivo = False
+        self._writer = csv.writer(self._arquivo, delimiter=";", lineterminator="\n")
+        self._writer.writerow(self.colunas)
+
+    def escrever(self, dados: dict):
+        self._writer.writerow(self._valores(dados))
+        self.linhas += 1
+
+    def fechar(self):
+        if self._arquivo is None:
+            return
+        self._arquivo.flush()
+        if self._fechar_arquivo:
+            self._arquivo.close()
+        else:
+            self._arquivo.detach()
+        self._arquivo = None
+
+
+class EscritorXLSX(_Escritor):
+    """
+    Planilha XLSX gravada com o modo constant_memory do xlsxwriter.
+
+    Nesse modo cada linha vai para o disco assim que a próxima começa, então a memória
+    não cresce com o número de linhas. Ao atingir o limite do Excel, uma nova aba é criada.
+    """
+
+    extensao = ".xlsx"
+    mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def __init__(self, destino, colunas=None):
+        super().__init__(destino, colunas)
+        try:
+            import xlsxwriter
+        except ImportError as e:
+            raise ImportError("A saída em XLSX requer o pacote xlsxwriter (pip install xlsxwriter).") from e
+        # Nomes de arquivo e textos do PDF vêm do usuário: "=..." é gravado como texto, nunca como fórmula
+        self._workbook = xlsxwriter.Workbook(destino, {"constant_memory": True, "in_memory": False,
+                                                       "strings_to_formulas": False})
+        self._abas = 0
+        self._nova_aba()
+
+    def _nova_aba(self):
+        self._abas += 1
+        self._worksheet = self._workbook.add_worksheet("Dados" if self._abas == 1 else f"Dados {self._abas}")
+        self._worksheet.write_row(0, 0, self.colunas)
+        self._linha = 1
+
+    def escrever(self, dados: dict):
+        if self._linha >= LIMITE_LINHAS_XLSX:
+            self._nova_aba()
+        self._worksheet.write_row(self._linha, 0, self._valores(dados))
+        self._linha += 1
+        self.linhas += 1
+
+    def fechar(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+class EscritorParquet(_Escritor):
+    """
+    Arquivo Parquet gravado em row groups de tamanho fixo com o pyarrow.
+
+    Só as linhas do row group atual ficam em memória.
+    """
+
+    extensao = ".parquet"
+    mime = "application/vnd.apache.parquet"
+
+    def __init__(self, destino, colunas=None, linhas_por_grupo: int = 10_000):
+        super().__init__(destino, colunas)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("A saída em Parquet requer o pacote pyarrow (pip install pyarrow).") from e
+        self._pa = pa
+        self._schema = pa.schema([
+            (coluna, pa.int64() if coluna in COLUNAS_INTEIRAS else pa.float64() if coluna in COLUNAS_DECIMAIS else pa.string())
+            for coluna in self.colunas
+        ])
+        self._writer = pq.ParquetWriter(destino, self._schema)
+        self.linhas_por_grupo = linhas_por_grupo
+        self._grupo = [[] for _ in self.colunas]
+
+    def escrever(self, dados: dict):
+        for coluna, valor in zip(self._grupo, self._valores(dados)):
+            coluna.append(valor)
+        self.linhas += 1
+        if len(self._grupo[0]) >= self.linhas_por_grupo:
+            self._gravar_grupo()
+
+    def _gravar_grupo(self):
+        if not self._grupo[0]:
+            return
+        self._writer.write_table(self._pa.Table.from_arrays(self._grupo, schema=self._schema))
+        self._grupo = [[] for _ in self.colunas]
+
+    def fechar(self):
+        if self._writer is not None:
+            self._gravar_grupo()
+            self._writer.close()
+            self._writer = None
+
+
+ESCRITORES = {
+    "csv": EscritorCSV,
+    "xlsx": EscritorXLSX,
+    "parquet": EscritorParquet,
+}
+
+
+def formato_do_arquivo(caminho: str, padrao: str = "csv") -> str:
+    """Deduz o formato de saída pela extensão do arquivo."""
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    return extensao if extensao in ESCRITORES else padrao
+
+
+def criar_escritor(formato: str, destino, colunas=None):
+    """
+    Cria o escritor de saída para o formato pedido.
+
+    Args:
+        formato: "csv", "xlsx" ou "parquet".
+        destino: Caminho do arquivo ou arquivo binário aberto.
+        colunas: Ordem das colunas; por padrão, colunas_saida().
+
+    Returns:
+        Um escritor com os métodos escrever(dados) e fechar().
+    """
+    try:
+        classe = ESCRITORES[formato]
+    except KeyError:
+        raise ValueError(f"Formato de saída desconhecido: {formato}") from None
+    return classe(destino, colunas)
@@ -0,0 +1,70 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+from api import PoolExtracao, Servico, criar_app
+from benchmarks.sintetico import gerar_relatorio
+from extrator import FALHA_CORROMPIDO, FALHA_TEMPO, extrair_pdf
+from test_processamento import extrator_lento
+
+
+def _extrair(pool, duracoes):
+    async def extrair_todos():
+        return await asyncio.gather(*(pool.extrair(str(duracao).encode(), f"{n}.pdf")
+                                      for n, duracao in enumerate(duracoes)))
+
+    pool.iniciar()
+    try:
+        return asyncio.run(extrair_todos())
+    finally:
+        pool.encerrar()
+
+
+def test_espera_por_um_processo_livre_nao_conta_no_tempo_limite():
+    pool = PoolExtracao(1, tempo_limite=2.0, extrator=extrator_lento)
+    linhas = _extrair(pool, [1.8] * 3)
+    assert [linha.get("Falha") for linha in linhas] == [None] * 3
+    assert pool.reinicios == 0
+
+
+def test_pdf_travado_nao_derruba_as_outras_requisicoes():
+    pool = PoolExtracao(1, tempo_limite=1.0, extrator=extrator_lento)
+    linhas = _extrair(pool, [0.1, 30, 0.1, 0.1])
+    assert [linha.get("Falha") for linha in linhas] == [None, FALHA_TEMPO, None, None]
+    assert pool.reinicios == 1
+
+
+def test_endpoints_de_extracao():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    pdf = gerar_relatorio(0, debitos=3)
+    esperado = extrair_pdf(pdf, "a.pdf")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_ref:
+        zip_ref.writestr("b.pdf", pdf)
+        zip_ref.writestr("ruim.pdf", b"nao e um pdf")
+
+    servico = Servico(1, tempo_limite=30, usar_cache=False, usar_ocr=False)
+    with TestClient(criar_app(servico)) as cliente:
+        resposta = cliente.post("/extrair", files={"arquivo": ("a.pdf", pdf, "application/pdf")})
+        assert resposta.status_code == 200
+        assert resposta.json()["Renavam"] == esperado["Renavam"]
+
+        resposta = cliente.post("/extrair/lote", files=[
+            ("arquivos", ("lote.zip", buffer.getvalue(), "application/zip")),
+            ("arquivos", ("c.pdf", pdf, "application/pdf")),
+        ])
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("application/x-ndjson")
+        linhas = {linha["Nome do Arquivo"]: linha for linha in map(json.loads, resposta.text.splitlines())}
+        assert set(linhas) == {"b.pdf", "ruim.pdf", "c.pdf"}
+        assert linhas["b.pdf"]["Renavam"] == linhas["c.pdf"]["Renavam"] == esperado["Renavam"]
+        assert linhas["ruim.pdf"]["Falha"] == FALHA_CORROMPIDO
+
+        resposta = cliente.post("/extrair/lote", files=[("arquivos", ("quebrado.zip", b"nao e um zip", "application/zip"))])
+        assert resposta.status_code == 400
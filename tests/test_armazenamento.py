@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from armazenamento import PASTA_BASE, caminho_padrao, conectar, transacao
+
+ESQUEMA = "CREATE TABLE IF NOT EXISTS itens (nome TEXT PRIMARY KEY);"
+
+
+def test_caminho_padrao(monkeypatch):
+    monkeypatch.delenv("EXTRATOR_TESTE", raising=False)
+    assert caminho_padrao("EXTRATOR_TESTE", "x.sqlite") == os.path.join(PASTA_BASE, "x.sqlite")
+    monkeypatch.setenv("EXTRATOR_TESTE", "/tmp/outro.sqlite")
+    assert caminho_padrao("EXTRATOR_TESTE", "x.sqlite") == "/tmp/outro.sqlite"
+
+
+def test_transacao_desfaz_as_escritas_se_o_bloco_falhar(tmp_path):
+    conexao = conectar(str(tmp_path / "pasta" / "banco.sqlite"), ESQUEMA)
+    with transacao(conexao):
+        conexao.execute("INSERT INTO itens VALUES ('a')")
+    with pytest.raises(ValueError), transacao(conexao):
+        conexao.execute("INSERT INTO itens VALUES ('b')")
+        raise ValueError
+    assert conexao.execute("SELECT nome FROM itens").fetchall() == [("a",)]
+
+
+def test_outra_versao_recria_as_tabelas_descartaveis(tmp_path):
+    caminho = str(tmp_path / "banco.sqlite")
+    conexao = conectar(caminho, ESQUEMA, versao=1, descartar=("itens",))
+    with transacao(conexao):
+        conexao.execute("INSERT INTO itens VALUES ('a')")
+    conexao.close()
+
+    conexao = conectar(caminho, ESQUEMA, versao=1, descartar=("itens",))
+    assert conexao.execute("SELECT COUNT(*) FROM itens").fetchone()[0] == 1
+    conexao.close()
+    conexao = conectar(caminho, ESQUEMA, versao=2, descartar=("itens",))
+    assert conexao.execute("SELECT COUNT(*) FROM itens").fetchone()[0] == 0
+    assert conexao.execute("PRAGMA user_version").fetchone()[0] == 2
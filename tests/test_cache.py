@@ -0,0 +1,65 @@
+import itertools
+import json
+
+import pytest
+
+import cache
+from cache import CacheResultados
+
+
+def _dados(letra: str, tamanho: int = 100) -> dict:
+    return {"Nome do Arquivo": f"{letra}.pdf", "Cor": letra * tamanho}
+
+
+def _tamanho(dados: dict) -> int:
+    return len(json.dumps(dados, ensure_ascii=False).encode("utf-8"))
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio que avança a cada leitura: a ordem de acesso não depende da resolução de time.time()."""
+    contador = itertools.count(1)
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(contador)))
+
+
+def test_lru_remove_o_acessado_ha_mais_tempo(tmp_path, relogio):
+    itens = {letra: _dados(letra) for letra in "abcd"}
+    resultados = CacheResultados(str(tmp_path / "cache.sqlite"), tamanho_maximo=3 * _tamanho(itens["a"]))
+    for letra in "abc":
+        resultados.gravar(letra, itens[letra])
+    # "a" foi lido depois de "b" ser gravado: "b" é o mais antigo quando "d" não cabe
+    assert resultados.obter("a") == itens["a"]
+    resultados.gravar("d", itens["d"])
+
+    assert resultados.obter("b") is None
+    for letra in "acd":
+        assert resultados.obter(letra) == itens[letra]
+    estatisticas = resultados.estatisticas()
+    assert estatisticas["itens"] == 3
+    assert estatisticas["tamanho"] == 3 * _tamanho(itens["a"])
+
+
+def test_outra_versao_do_extrator_nao_acerta(tmp_path, monkeypatch):
+    resultados = CacheResultados(str(tmp_path / "cache.sqlite"))
+    chave = resultados.chave_do_hash("0" * 64)
+    resultados.gravar(chave, _dados("a"))
+    assert resultados.obter(chave) == _dados("a")
+
+    monkeypatch.setattr(cache, "VERSAO_EXTRATOR", cache.VERSAO_EXTRATOR + 1)
+    nova = resultados.chave_do_hash("0" * 64)
+    assert nova != chave
+    assert resultados.obter(nova) is None
+
+
+def test_regravar_a_mesma_chave_atualiza_o_tamanho_total(tmp_path):
+    resultados = CacheResultados(str(tmp_path / "cache.sqlite"))
+    resultados.gravar("a", _dados("a", 500))
+    resultados.gravar("a", _dados("a", 50))
+    resultados.gravar("b", _dados("b", 10))
+
+    estatisticas = resultados.estatisticas()
+    assert estatisticas["itens"] == 2
+    assert estatisticas["tamanho"] == _tamanho(_dados("a", 50)) + _tamanho(_dados("b", 10))
+    resultados.fechar()
+    # O total persistido é o mesmo ao reabrir o banco
+    assert CacheResultados(str(tmp_path / "cache.sqlite")).estatisticas()["tamanho"] == estatisticas["tamanho"]
@@ -0,0 +1,91 @@
+import io
+import zipfile
+
+import pytest
+
+from entrada import contar_pdfs_locais, iterar_pdfs_locais
+from extrator import FALHA_CORROMPIDO, FALHA_CRIPTOGRAFADO, em_quarentena
+from processamento import MotorSequencial
+
+
+def _zip(membros: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_ref:
+        for nome, conteudo in membros.items():
+            zip_ref.writestr(nome, conteudo)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    """Um PDF solto, um ZIP com um ZIP interno e outro PDF solto: 7 PDFs no total."""
+    interno = _zip({"c.pdf": b"c", "d.pdf": b"d"})
+    caminhos = {
+        "1.pdf": b"1",
+        "lote.zip": _zip({"a.pdf": b"a", "pasta/": b"", "b.pdf": b"b", "interno.zip": interno, "e.pdf": b"e"}),
+        "2.pdf": b"2",
+    }
+    for nome, conteudo in caminhos.items():
+        (tmp_path / nome).write_bytes(conteudo)
+    return [str(tmp_path / nome) for nome in caminhos]
+
+
+@pytest.mark.parametrize("pular", range(8))
+def test_pular_equivale_a_descartar_o_inicio(arquivos, pular):
+    todos = list(iterar_pdfs_locais(arquivos))
+    assert len(todos) == 7
+    assert list(iterar_pdfs_locais(arquivos, pular=pular)) == todos[pular:]
+
+
+def test_pular_nao_le_os_pdfs_descartados(arquivos, monkeypatch):
+    lidos = []
+    ler = zipfile.ZipFile.read
+    monkeypatch.setattr(zipfile.ZipFile, "read", lambda self, membro: lidos.append(membro.filename) or ler(self, membro))
+
+    primeiro = next(iterar_pdfs_locais(arquivos, pular=4))
+    assert primeiro == (b"d", "interno.zip/d.pdf")
+    assert lidos == ["d.pdf"]
+
+
+def _corromper(dados: bytes, conteudo: bytes) -> bytes:
+    """Troca os bytes de um membro gravado sem compressão: o CRC deixa de bater."""
+    return dados.replace(conteudo, bytes(reversed(conteudo)), 1)
+
+
+def _criptografar(dados: bytes, nome: str) -> bytes:
+    """Liga o bit de senha do membro no cabeçalho local e no diretório central."""
+    dados = bytearray(dados)
+    for assinatura, deslocamento in ((b"PK\x03\x04", 6), (b"PK\x01\x02", 8)):
+        inicio = 0
+        while (inicio := dados.find(assinatura, inicio)) != -1:
+            cabecalho = bytes(dados[inicio:inicio + 64])
+            if nome.encode() in cabecalho:
+                dados[inicio + deslocamento] |= 0x1
+            inicio += 4
+    return bytes(dados)
+
+
+def test_membros_ilegiveis_viram_linhas_de_falha(tmp_path):
+    interno = _zip({"c.pdf": b"conteudo c"})
+    lote = _zip({"a.pdf": b"conteudo a", "ruim.pdf": b"conteudo ruim", "senha.pdf": b"conteudo senha",
+                 "interno.zip": interno, "quebrado.zip": b"nao e um zip", "b.pdf": b"conteudo b"})
+    lote = _criptografar(_corromper(lote, b"conteudo ruim"), "senha.pdf")
+    caminho = tmp_path / "lote.zip"
+    caminho.write_bytes(lote)
+
+    itens = list(iterar_pdfs_locais([str(caminho)]))
+    assert len(itens) == contar_pdfs_locais([str(caminho)]) == 6
+    nomes = [nome for _, nome in itens]
+    assert nomes == ["a.pdf", "ruim.pdf", "senha.pdf", "interno.zip/c.pdf", "quebrado.zip", "b.pdf"]
+    conteudos = {nome: conteudo for conteudo, nome in itens}
+    assert conteudos["a.pdf"] == b"conteudo a"
+    assert conteudos["b.pdf"] == b"conteudo b"
+    assert conteudos["interno.zip/c.pdf"] == b"conteudo c"
+    assert conteudos["ruim.pdf"]["Falha"] == FALHA_CORROMPIDO
+    assert conteudos["senha.pdf"]["Falha"] == FALHA_CRIPTOGRAFADO
+    assert conteudos["quebrado.zip"]["Falha"] == FALHA_CORROMPIDO
+
+    # O motor põe as linhas ilegíveis na quarentena e extrai o resto
+    motor = MotorSequencial(extrator=lambda conteudo, filename: {"Nome do Arquivo": filename})
+    linhas = [dados for _, dados in motor.processar(iterar_pdfs_locais([str(caminho)]))]
+    assert [em_quarentena(dados) for dados in linhas] == [False, True, True, False, True, False]
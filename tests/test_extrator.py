@@ -0,0 +1,185 @@
+import re
+
+import pymupdf
+import pytest
+
+import extrator
+from benchmarks.regex_campos import extrair_campos_legado, textos_de_exemplo
+from benchmarks.sintetico import LINK, RESTRICOES, gerar_relatorio
+from extrator import (DETRAN_SP, FALHA_MODELO, FALHA_SEM_TEXTO, MARCADOR_FIM, MARCADOR_INICIO, Campo, Modelo,
+                      delimitar_texto, extrair_campos, extrair_pdf, identificar_modelo, limpar_texto, registrar_modelo)
+from processamento import MotorSequencial
+
+
+class _Documento(list):
+    """Documento de mentira para delimitar_texto: uma lista com o texto de cada página."""
+
+    @property
+    def page_count(self):
+        return len(self)
+
+
+def _delimitar(paginas, so_paginas_relevantes=True):
+    return delimitar_texto(_Documento(paginas), so_paginas_relevantes, ler_pagina=lambda pagina: pagina)
+
+
+# --- Paridade da tabela CAMPOS com o bloco antigo de regex ---
+
+@pytest.mark.parametrize("nome", list(textos_de_exemplo()))
+def test_campos_iguais_ao_legado_nos_textos_de_exemplo(nome):
+    text = textos_de_exemplo()[nome]
+    assert extrair_campos(limpar_texto(text)) == extrair_campos_legado(text)
+
+
+@pytest.mark.parametrize("semente,debitos,restricoes", [
+    (0, 0, ()),
+    (1, 5, ("financeira",)),
+    (2, 80, ("furto_roubo", "judicial", "guinchado")),
+    (3, 200, tuple(RESTRICOES)),
+])
+def test_campos_iguais_ao_legado_nos_pdfs_sinteticos(semente, debitos, restricoes):
+    with pymupdf.open(stream=gerar_relatorio(semente, debitos, paginas_extras=1, restricoes=restricoes)) as doc:
+        text, _ = delimitar_texto(doc, so_paginas_relevantes=False)
+    assert extrair_campos(limpar_texto(text)) == extrair_campos_legado(text)
+
+
+# --- delimitar_texto: leitura parcial igual ao recorte do texto completo ---
+
+@pytest.mark.parametrize("paginas,ignoradas", [
+    # Início e fim na mesma página, com anexos depois do rodapé
+    ([f"cabeçalho {MARCADOR_INICIO} dados {MARCADOR_FIM} aviso", "anexo 1", "anexo 2"], 2),
+    # Trecho em várias páginas, fim na última
+    ([f"cabeçalho {MARCADOR_INICIO} a", "b", f"c {MARCADOR_FIM}"], 0),
+    # Páginas antes do início
+    (["capa", f"{MARCADOR_INICIO} a", f"b {MARCADOR_FIM}", "anexo"], 1),
+    # Sem rodapé: vai até a última página
+    ([f"{MARCADOR_INICIO} a", "b"], 0),
+    # Sem marcador de início: texto completo
+    (["a", f"b {MARCADOR_FIM}", "c"], 0),
+    # Rodapé em página anterior ao início: recorte vazio
+    ([f"{MARCADOR_FIM}", f"{MARCADOR_INICIO} a", "b"], 1),
+    # Rodapé antes do início na mesma página
+    ([f"{MARCADOR_FIM} {MARCADOR_INICIO} a", "b"], 1),
+    # Documento sem páginas
+    ([], 0),
+])
+def test_delimitar_texto_igual_ao_recorte_completo(paginas, ignoradas):
+    esperado, _ = _delimitar(paginas, so_paginas_relevantes=False)
+    assert _delimitar(paginas) == (esperado, ignoradas)
+
+
+def test_delimitar_texto_nao_le_paginas_depois_do_rodape():
+    lidas = []
+    paginas = _Documento([f"{MARCADOR_INICIO} a", f"b {MARCADOR_FIM}", "anexo 1", "anexo 2"])
+
+    def ler(pagina):
+        lidas.append(pagina)
+        return pagina
+
+    delimitar_texto(paginas, ler_pagina=ler)
+    assert lidas == paginas[:2]
+
+
+def test_delimitar_texto_nos_pdfs_sinteticos():
+    with pymupdf.open(stream=gerar_relatorio(7, debitos=120, paginas_extras=3)) as doc:
+        completo, _ = delimitar_texto(doc, so_paginas_relevantes=False)
+        parcial, ignoradas = delimitar_texto(doc)
+    assert parcial == completo
+    assert ignoradas == 3
+
+
+# --- Digitalização com o cabeçalho do navegador como texto ---
+
+def _digitalizado_com_cabecalho() -> bytes:
+    """Relatório sintético rasterizado, com o link do navegador gravado como texto por cima."""
+    with pymupdf.open(stream=gerar_relatorio(0, debitos=3)) as original, pymupdf.open() as doc:
+        for pagina in original:
+            imagem = pagina.get_pixmap(dpi=50)
+            nova = doc.new_page(width=pagina.rect.width, height=pagina.rect.height)
+            nova.insert_image(nova.rect, pixmap=imagem)
+            nova.insert_text((20, 15), LINK, fontsize=6)
+        return doc.tobytes()
+
+
+def test_digitalizacao_com_cabecalho_em_texto_vai_para_o_ocr():
+    conteudo = _digitalizado_com_cabecalho()
+    dados = extrair_pdf(conteudo, "scan.pdf")
+    assert dados["Falha"] == FALHA_SEM_TEXTO
+
+    usados = []
+
+    def extrator_ocr(conteudo, filename):
+        usados.append(filename)
+        return {"Nome do Arquivo": filename, "Renavam": "12345678901"}
+
+    motor = MotorSequencial(extrator_ocr=extrator_ocr)
+    [(_, dados)] = motor.processar([(conteudo, "scan.pdf")])
+    assert usados == ["scan.pdf"]
+    assert dados["Renavam"] == "12345678901"
+
+
+def test_relatorio_com_texto_sem_campos_e_layout_diferente():
+    with pymupdf.open() as doc:
+        pagina = doc.new_page()
+        pagina.insert_text((40, 60), "Detran-SP - Consulta de débitos\nLayout novo sem os rótulos antigos", fontsize=10)
+        conteudo = doc.tobytes()
+    dados = extrair_pdf(conteudo, "novo.pdf")
+    assert dados["Falha"] == FALHA_MODELO
+
+
+# --- Registro de modelos ---
+
+@pytest.fixture
+def modelos(monkeypatch):
+    """Registro de modelos isolado: os modelos registrados no teste não vazam para os outros."""
+    monkeypatch.setattr(extrator, "MODELOS", list(extrator.MODELOS))
+    return extrator.MODELOS
+
+
+def _pdf(*paginas: str) -> bytes:
+    with pymupdf.open() as doc:
+        for texto in paginas:
+            doc.new_page().insert_text((40, 60), texto, fontsize=10)
+        return doc.tobytes()
+
+
+OUTRO = Modelo(
+    nome="outro",
+    identificadores=("Prefeitura Exemplo",),
+    marcador_inicio="Início",
+    marcador_fim="Fim",
+    campos=(Campo("Placa", "Placa", re.compile(r"Placa\s*(\w+)")),),
+    limpar=lambda text: text,
+)
+
+
+def test_primeira_pagina_desconhecida_nao_le_as_outras():
+    lidas = []
+
+    def ler(pagina):
+        lidas.append(pagina.number)
+        return pagina.get_text()
+
+    dados = extrair_pdf(_pdf("Boletim de outro órgão", "página 2", "página 3"), "x.pdf", ler_pagina=ler)
+    assert dados["Falha"] == FALHA_MODELO
+    assert lidas == [0]
+
+
+def test_segundo_modelo_registrado_e_escolhido(modelos):
+    registrar_modelo(OUTRO)
+    assert [modelo.nome for modelo in modelos] == ["detran-sp", "outro"]
+    assert identificar_modelo("Prefeitura Exemplo") is OUTRO
+    assert identificar_modelo("Detran-SP") is DETRAN_SP
+
+    dados = extrair_pdf(_pdf("Prefeitura Exemplo\nInício\nPlaca ABC1234\nFim\nrodapé"), "x.pdf")
+    assert dados["Modelo"] == "outro"
+    assert dados["Placa"] == "ABC1234"
+
+
+def test_registrar_modelo_substitui_o_de_mesmo_nome(modelos):
+    registrar_modelo(OUTRO)
+    novo = OUTRO._replace(identificadores=("Prefeitura Nova",))
+    registrar_modelo(novo)
+    assert [modelo.nome for modelo in modelos] == ["detran-sp", "outro"]
+    assert identificar_modelo("Prefeitura Nova") is novo
+    assert identificar_modelo("Prefeitura Exemplo") is None
@@ -0,0 +1,52 @@
+import sqlite3
+
+from indice import IndiceVeiculos, posicoes_mais_recentes
+
+
+def _relatorio(renavam, emissao=None, **outros):
+    dados = {"Nome do Arquivo": f"{renavam}-{emissao}.pdf", "Renavam": renavam, **outros}
+    if emissao:
+        dados["Data de Emissão"] = emissao
+    return dados
+
+
+def test_mais_recente_pela_data_de_emissao_e_nao_pela_ordem():
+    linhas = [
+        _relatorio("11111111111", "2026-03-01 10:00"),
+        _relatorio("11111111111", "2025-12-31 23:59"),  # Reenvio de um relatório antigo
+        {"Nome do Arquivo": "sem_chave.pdf"},
+        _relatorio("22222222222"),
+        _relatorio("22222222222"),                      # Sem data: vale a ordem de entrada
+        _relatorio("33333333333"),
+        _relatorio("33333333333", "2024-01-01 00:00"),  # Com data ganha de sem data
+        _relatorio("33333333333"),
+    ]
+    assert posicoes_mais_recentes(iter(linhas)) == {0, 2, 4, 6}
+
+
+def test_indice_guarda_o_relatorio_mais_recente_e_so_o_veiculo_de_cada_pdf(tmp_path):
+    caminho = str(tmp_path / "indice.sqlite")
+    indice = IndiceVeiculos(caminho)
+    indice.registrar("a" * 64, _relatorio("11111111111", "2026-03-01 10:00", Cor="PRATA"))
+    indice.registrar("b" * 64, _relatorio("11111111111", "2025-01-01 10:00", Cor="AZUL"))
+
+    assert indice.consultar(renavam="11111111111").cor == "PRATA"
+    assert indice.contem("b" * 64)
+    assert not indice.contem("c" * 64)
+    assert indice.estatisticas() == {"arquivos": 2, "veiculos": 1}
+    indice.fechar()
+
+    # A tabela de arquivos não guarda as linhas extraídas (elas ficam no CacheResultados)
+    with sqlite3.connect(caminho) as conexao:
+        colunas = [coluna[1] for coluna in conexao.execute("PRAGMA table_info(arquivos)")]
+    assert colunas == ["sha256", "versao", "veiculo"]
+
+
+def test_banco_do_esquema_antigo_e_recriado(tmp_path):
+    caminho = str(tmp_path / "indice.sqlite")
+    with sqlite3.connect(caminho) as conexao:
+        conexao.execute("CREATE TABLE arquivos (sha256 TEXT PRIMARY KEY, versao INTEGER, veiculo TEXT, "
+                        "visto_em REAL, dados TEXT)")
+    indice = IndiceVeiculos(caminho)
+    indice.registrar("a" * 64, _relatorio("11111111111", "2026-03-01 10:00"))
+    assert indice.consultar(renavam="11111111111").renavam == "11111111111"
@@ -0,0 +1,18 @@
+import pytest
+
+from lotes import FilaLotes
+
+
+@pytest.fixture
+def fila(tmp_path):
+    fila = FilaLotes(str(tmp_path / "lotes"))
+    yield fila
+    fila.fechar()
+
+
+@pytest.mark.parametrize("lote_id", ["../lotes", "..", "abc", "ABCDEF123456", "0123456789ab/.."])
+def test_recusa_ids_fora_do_formato(fila, lote_id):
+    with pytest.raises(ValueError):
+        fila.estado(lote_id)
+    with pytest.raises(ValueError):
+        fila.remover(lote_id)
@@ -0,0 +1,48 @@
+import memoria
+from memoria import GovernadorMemoria
+
+MB = 1024 * 1024
+
+
+def _rss(monkeypatch, valor_mb):
+    monkeypatch.setattr(memoria, "rss_atual", lambda: int(valor_mb * MB))
+
+
+def test_coleta_uma_vez_enquanto_o_rss_nao_cresce(monkeypatch):
+    _rss(monkeypatch, 150)
+    governador = GovernadorMemoria(100)
+
+    assert governador.coletar_se_necessario()
+    # O RSS não caiu depois da coleta: nem nova coleta nem janela encolhida
+    assert not any(governador.coletar_se_necessario() for _ in range(100))
+    assert not governador.aguardar()
+    assert governador.coletas == 1
+
+    # Crescer menos que a margem não conta; passar dela volta a coletar
+    _rss(monkeypatch, 155)
+    assert not governador.coletar_se_necessario()
+    _rss(monkeypatch, 161)
+    assert governador.aguardar()
+    assert governador.coletar_se_necessario()
+    assert governador.coletas == 2
+
+
+def test_esperas_conta_periodos_e_nao_consultas(monkeypatch):
+    _rss(monkeypatch, 10)
+    governador = GovernadorMemoria(100, limite_em_voo_mb=1)
+
+    governador.reservar(2 * MB)
+    assert all(governador.aguardar() for _ in range(10))
+    governador.liberar(2 * MB)
+    assert not governador.aguardar()
+    governador.reservar(2 * MB)
+    assert governador.aguardar()
+
+    assert governador.esperas == 2
+
+
+def test_sem_limite_nunca_age(monkeypatch):
+    _rss(monkeypatch, 10_000)
+    governador = GovernadorMemoria(None)
+    assert not governador.aguardar()
+    assert not governador.coletar_se_necessario()
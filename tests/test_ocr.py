@@ -0,0 +1,36 @@
+import pytest
+
+from ocr import ler_texto_ocr
+
+
+class _Pagina:
+    """Página de mentira: registra as chamadas ao OCR."""
+
+    def __init__(self, texto: str, imagens: int):
+        self.texto = texto
+        self.imagens = imagens
+        self.ocr = None
+
+    def get_text(self, textpage=None):
+        return "texto do ocr" if textpage else self.texto
+
+    def get_images(self):
+        return [object()] * self.imagens
+
+    def get_textpage_ocr(self, language, dpi, full):
+        self.ocr = full
+        return object()
+
+
+@pytest.mark.parametrize("texto,imagens,ocr,esperado", [
+    # Página digital: fica com a camada de texto
+    ("Renavam 12345678901", 0, None, "Renavam 12345678901"),
+    # Digitalização sem texto: OCR da página inteira
+    ("  ", 1, True, "texto do ocr"),
+    # Digitalização com o cabeçalho do navegador em texto: OCR só das imagens
+    ("detran.sp.gov.br", 1, False, "texto do ocr"),
+])
+def test_ler_texto_ocr(texto, imagens, ocr, esperado):
+    pagina = _Pagina(texto, imagens)
+    assert ler_texto_ocr(pagina) == esperado
+    assert pagina.ocr is ocr
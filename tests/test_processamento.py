@@ -0,0 +1,40 @@
+import time
+
+from extrator import FALHA_TEMPO
+from processamento import MotorParalelo, em_ordem
+
+
+def extrator_lento(conteudo: bytes, filename: str, tempos=None) -> dict:
+    """Extrator de teste: dorme os segundos escritos no "PDF"."""
+    time.sleep(float(conteudo))
+    return {"Nome do Arquivo": filename}
+
+
+def _processar(motor, duracoes):
+    arquivos = [(str(duracao).encode(), f"{n}.pdf") for n, duracao in enumerate(duracoes)]
+    with motor:
+        return list(em_ordem(motor.processar(arquivos)))
+
+
+def test_espera_na_fila_nao_conta_no_tempo_limite():
+    # Cada PDF cabe no limite, mas a soma dos que esperam pelo único processo não
+    motor = MotorParalelo(1, extrator=extrator_lento, tempo_limite=2.0)
+    linhas = _processar(motor, [1.8] * 3)
+    assert [linha.get("Falha") for linha in linhas] == [None] * 3
+    assert motor.reinicios == 0
+
+
+def test_pdf_travado_vai_para_a_quarentena_e_os_outros_seguem():
+    motor = MotorParalelo(1, extrator=extrator_lento, tempo_limite=1.0)
+    linhas = _processar(motor, [0.1, 30, 0.1, 0.1])
+    assert [linha.get("Falha") for linha in linhas] == [None, FALHA_TEMPO, None, None]
+    assert motor.reinicios == 1
+
+
+def test_sair_do_motor_no_meio_do_lote_nao_espera_o_pdf_travado():
+    motor = MotorParalelo(2, extrator=extrator_lento, tempo_limite=60.0)
+    arquivos = [(b"0.1", "0.pdf"), (b"30", "1.pdf")]
+    inicio = time.monotonic()
+    with motor:
+        next(motor.processar(arquivos))
+    assert time.monotonic() - inicio < 10
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from registros import FiltrosTabela, Relatorio, com_restricao, resumir, tabela
+
+LINHAS = [
+    {"Nome do Arquivo": "a.pdf", "Data de Emissão": "2026-03-01 10:00", "Renavam": "11111111111",
+     "Ano fabricação": "2015", "Total IPVA": "R$ 1.234,56", "Total Multas (Pix)": "R$ 130,16",
+     "Restrição Financeira": "Alienação fiduciária", "Bloqueio de Furto/Roubo": "Nada consta"},
+    {"Nome do Arquivo": "b.pdf", "Renavam": "22222222222", "Total IPVA": None,
+     "Total Multas (Pix)": "R$ 0,00", "Restrição Financeira": "Nada consta"},
+]
+
+
+def test_relatorio_converte_os_valores():
+    relatorio = Relatorio.de_dict(LINHAS[0])
+    assert relatorio.total_ipva == 1234.56
+    assert relatorio.ano_fabricacao == 2015
+    assert relatorio.data_emissao == "2026-03-01 10:00"
+    assert relatorio.tem_restricao
+    assert not Relatorio.de_dict(LINHAS[1]).tem_restricao
+    assert relatorio.para_dict()["Total IPVA"] == 1234.56
+
+
+def test_tabela_igual_as_conversoes_do_relatorio():
+    df = tabela(LINHAS)
+    assert df["Total IPVA"].dtype == "Float64"
+    assert df["Ano fabricação"].dtype == "Int16"
+    assert df["Total IPVA"].tolist() == [Relatorio.de_dict(linha).total_ipva or pd.NA for linha in LINHAS]
+
+    totais = resumir(df)
+    assert totais["total_ipva"] == 1234.56
+    assert totais["total_multas"] == 130.16
+    assert totais["com_restricao"] == 1
+
+
+def _linhas_filtro():
+    # Valores repetidos, zero e linhas sem IPVA, com e sem restrição
+    valores = ["R$ 500,00", None, "R$ 0,00", "R$ 1.200,50", "R$ 500,00", None, "R$ 80,00", "R$ 500,01"]
+    restricoes = ["Alienação fiduciária", "Nada consta", "Nada consta", "Alienação fiduciária",
+                  "Nada consta", "Alienação fiduciária", "Nada consta", "Nada consta"]
+    return [{"Nome do Arquivo": f"{n}.pdf", "Total IPVA": valor, "Restrição Financeira": restricao}
+            for n, (valor, restricao) in enumerate(zip(valores, restricoes))]
+
+
+@pytest.mark.parametrize("so_com_restricao", [False, True])
+@pytest.mark.parametrize("ipva_minimo", [None, -1.0, 0.0, 80.0, 499.99, 500.0, 500.01, 1200.5, 5000.0])
+def test_filtros_iguais_ao_filtro_do_pandas(so_com_restricao, ipva_minimo):
+    df = tabela(_linhas_filtro())
+    esperado = pd.Series(True, index=df.index)
+    if so_com_restricao:
+        esperado &= com_restricao(df)
+    if ipva_minimo is not None:
+        # "IPVA acima de X" é estrito; sem IPVA (NA), a linha fica de fora
+        esperado &= (df["Total IPVA"] > ipva_minimo).fillna(False).astype(bool)
+    posicoes = FiltrosTabela(df).posicoes(so_com_restricao, ipva_minimo)
+    assert posicoes.tolist() == np.flatnonzero(esperado.to_numpy()).tolist()
+
+
+def test_filtro_de_ipva_sem_a_coluna():
+    df = tabela([{"Nome do Arquivo": "a.pdf", "Restrição Financeira": "Alienação fiduciária"}])
+    filtros = FiltrosTabela(df)
+    assert filtros.posicoes(ipva_minimo=0.0).tolist() == []
+    assert filtros.posicoes(so_com_restricao=True).tolist() == [0]
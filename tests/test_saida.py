@@ -0,0 +1,23 @@
+import zipfile
+
+from extrator import colunas_saida
+from saida import COLUNAS_QUARENTENA, EscritorXLSX
+
+
+def test_xlsx_grava_formulas_como_texto(tmp_path):
+    destino = tmp_path / "saida.xlsx"
+    nome = '=HYPERLINK("http://exemplo.invalid","abrir")'
+    with EscritorXLSX(str(destino), ["Nome do Arquivo", "Cor"]) as escritor:
+        escritor.escrever({"Nome do Arquivo": nome, "Cor": "=1+1"})
+
+    with zipfile.ZipFile(destino) as xlsx:
+        planilha = xlsx.read("xl/worksheets/sheet1.xml").decode()
+        textos = xlsx.read("xl/sharedStrings.xml").decode() if "xl/sharedStrings.xml" in xlsx.namelist() else planilha
+    assert "<f>" not in planilha
+    assert "=HYPERLINK(" in textos
+
+
+def test_colunas_de_falha_so_na_quarentena():
+    assert "Erro" not in colunas_saida()
+    assert "Falha" not in colunas_saida()
+    assert "Erro" in COLUNAS_QUARENTENA